@@ -1,17 +1,17 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import copy
+import orjson
 from pathlib import Path
 import hashlib
 import time
 import io
+import threading
+from concurrent.futures import Future
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import os
 
 # Load environment variables
@@ -25,6 +25,9 @@ from core.compute import (
 	compute_ash_composition,
 	compute_bogue,
 	compute_alternative_fuel_heat_percentage,
+	calculate_all_stages,
+	calculate_quality_moduli,
+	fuel_arrays,
 )
 from core.ui import (
 	build_general_tab,
@@ -36,11 +39,13 @@ from core.ui import (
 	load_project_data,
 	save_current_project,
 	build_project_history_tab,
-	to_rm_dict,
-	to_bounds_dict,
-	to_costs_dict,
+	rm_df_to_dicts,
+	materials_index,
 	require_authentication,
 	build_user_profile_sidebar,
+	RAW_MIX_COLUMNS,
+	RAW_MIX_DTYPES,
+	DEFAULT_FUELS,
 )
 
 st.set_page_config(page_title="Raw Mix Design Optimizer", layout="wide")
@@ -50,9 +55,7 @@ if not require_authentication():
 	st.stop()
 
 # Dark Mode CSS
-def apply_dark_mode():
-	"""Apply dark mode styling"""
-	dark_css = """
+_DARK_CSS = """
 	<style>
 	/* Dark mode variables */
 	:root {
@@ -229,11 +232,9 @@ def apply_dark_mode():
 	}
 	</style>
 	"""
-	return dark_css
 
-def apply_light_mode():
-	"""Apply light mode styling (default Streamlit theme)"""
-	light_css = """
+# Light mode resets to the default Streamlit theme
+_LIGHT_CSS = """
 	<style>
 	/* Reset to default light theme */
 	.stApp {
@@ -242,12 +243,12 @@ def apply_light_mode():
 	}
 	</style>
 	"""
-	return light_css
 st.title("Raw Mix Design Optimizer")
 st.caption("Σ% = 100 with clinker-basis constraints (LSF, SM, AM, NaEq, C3S)")
 
-# Project Management Section in Sidebar
-build_project_management_sidebar()
+# Project Management Section in Sidebar; a fragment, so its own widgets rerun only this section
+with st.sidebar:
+	build_project_management_sidebar()
 
 # User Profile Section in Sidebar
 build_user_profile_sidebar()
@@ -259,497 +260,554 @@ with st.sidebar:
 	
 	# Apply theme
 	if dark_mode:
-		st.markdown(apply_dark_mode(), unsafe_allow_html=True)
+		st.markdown(_DARK_CSS, unsafe_allow_html=True)
 		st.markdown("**Current Theme:** 🌙 Dark")
 	else:
-		st.markdown(apply_light_mode(), unsafe_allow_html=True)
+		st.markdown(_LIGHT_CSS, unsafe_allow_html=True)
 		st.markdown("**Current Theme:** ☀️ Light")
 	
 	st.markdown("---")
 
+# Raw material lookup
+def _state_materials_index(state):
+	"""Materials index kept in state, rebuilt if missing"""
+	rm_lookup = state.get('rm_df_by_material')
+	if rm_lookup is None:
+		rm_lookup = materials_index(state.get('rm_df'))
+	return rm_lookup
+
 # Export Functions
-def create_excel_report(state, results):
+def _proportion_arrays(sol, rm_lookup, tonKF, h2o_rawmeal):
+	"""Vectorized TPH, Indeks Bahan, % Wet and cost for each solved material"""
+	materials = [m for m, percentage in sol.items() if percentage is not None]
+	n = len(materials)
+	pct = np.fromiter((sol[m] for m in materials), dtype=np.float64, count=n)
+	hpp = np.fromiter((rm_lookup.get(m, (0.0, 0.0))[0] for m in materials), dtype=np.float64, count=n)
+	h2o = np.fromiter((rm_lookup.get(m, (0.0, 0.0))[1] for m in materials), dtype=np.float64, count=n)
+	
+	tph = pct * tonKF / 100
+	# Indeks Bahan = Proporsi Dry [%] * (100-H2O Rawmeal)/(100-H2O Raw Mix)
+	dry_basis = 100 - h2o
+	indeks = np.zeros(n)
+	np.divide(pct * (100 - h2o_rawmeal), dry_basis, out=indeks, where=dry_basis > 0)
+	# % Wet is Indeks Bahan normalized to 100%
+	total_indeks = indeks.sum()
+	wet = indeks / total_indeks * 100 if total_indeks > 0 else np.zeros(n)
+	return materials, pct, wet, indeks, tph, hpp, tph * hpp
+
+def _attach_stage_results(results, state):
+	"""Copy of the results with stage compositions, moduli, Bogue phases and dust loss for the current state"""
+	g = state.get("general", {})
+	# Keyed on the current inputs, so edits made after the solve are reflected like in the reports
+	derived = _report_derived(state, results, calculate_state_hash(state, "report"), _results_hash(results))
+	return {
+		**results,
+		"stages": derived["stages"],
+		"rm_moduli": derived["moduli"]["raw_meal"],
+		"kf_moduli": derived["moduli"]["kiln_feed"],
+		"cl_moduli": derived["moduli"]["clinker"],
+		"bogue": derived["bogue"],
+		"dust_tph": g.get('dust_ratio', 3.0) / 100.0 * g.get('clinker_tph', 342.0),
+	}
+
+def _stage_results(sol, g, dust, ash_comp, RM):
+	"""Stage compositions, quality moduli and Bogue phases for a solution"""
+	stages = calculate_all_stages(
+		RM=RM,
+		x_percent=sol,
+		dust=dust,
+		pSilo=g.get("pSilo", 10.0) / 100.0,
+		pKiln=g.get("pKiln", 0.0) / 100.0,
+		tonKF=g.get("tonKF", 533.0),
+		clinker_tph=g.get("clinker_tph", 342.0),
+		dust_ratio=g.get("dust_ratio", 3.0) / 100.0,
+		ASH=ash_comp,
+		FCaO_cl=g.get("fcao", 1.0)
+	)
+	moduli = {name: calculate_quality_moduli(stages[name]) for name in ("raw_meal", "kiln_feed", "unignited", "clinker")}
+	# The clinker composition already carries FCaO
+	return {"stages": stages, "moduli": moduli, "bogue": compute_bogue(stages["clinker"])}
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _derived_results(results_key, state_key, _sol, _g, _dust, _ash_comp, _RM):
+	"""Cached stage results keyed on results and state hashes"""
+	return _stage_results(_sol, _g, _dust, _ash_comp, _RM)
+
+def _report_derived(state, results, state_hash, results_hash):
+	"""Stage results shared by the Excel and PDF reports"""
+	args = (results.get("solution", {}), state.get("general", {}), state.get("dust", {}), results.get("ash_comp", {}), state.get("rm_dict", {}))
+	if state_hash is None:
+		return _stage_results(*args)
+	return _derived_results(results_hash, state_hash, *args)
+
+def _render_excel_report(state, results, state_hash, results_hash):
 	"""Create comprehensive Excel report"""
-	try:
-		output = io.BytesIO()
+	output = io.BytesIO()
+	
+	# Report cells are plain values, so skip xlsxwriter's per-string URL/formula scans
+	excel_options = {"strings_to_urls": False, "strings_to_formulas": False}
+	# Decide up front which sheets have data so empty ones never run their setup
+	solved = bool(results) and results.get("status") == 1
+	sol = results.get("solution", {}) if solved else {}
+	has_details = bool(sol) and bool(state.get("rm_dict"))
+	
+	with pd.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={"options": excel_options}) as writer:
+		# Summary sheet
+		summary_data = []
+		if sol:
+			g = state.get("general", {})
+			rm_lookup = _state_materials_index(state)
+			
+			# Calculate H2O_Rawmeal (weighted average) for Indeks Bahan calculation
+			h2o_rawmeal = sum((pct / 100.0) * rm_lookup.get(m, (0.0, 0.0))[1] for m, pct in sol.items() if pct)
+			
+			# Add solution data with Indeks Bahan calculation
+			materials, pct, wet, indeks, tph, hpp, cost = _proportion_arrays(sol, rm_lookup, g.get('tonKF', 533.0), h2o_rawmeal)
+			summary_data = [
+				{
+					'Material': m,
+					'% Dry': f"{p:.2f}",
+					'% Wet': f"{w:.2f}",
+					'Indeks Bahan (%)': f"{ib:.2f}",
+					'TPH': f"{t:.1f}",
+					'HPP (Rp/t)': f"{h:,.0f}",
+					'Cost (Rp/h)': f"{c:,.0f}"
+				}
+				for m, p, w, ib, t, h, c in zip(materials, pct, wet, indeks, tph, hpp, cost)
+			]
+			
+			# Add TOTAL row to Excel export
+			if summary_data:
+				total_percentage = sum(float(row['% Dry']) for row in summary_data)
+				total_cost = sum(float(row['Cost (Rp/h)'].replace(',', '')) for row in summary_data)
+				total_indeks = sum(float(row['Indeks Bahan (%)']) for row in summary_data)
+				total_tph = g.get('tonKF', 533.0)
+				
+				summary_data.append({
+					'Material': 'TOTAL',
+					'% Dry': f"{total_percentage:.2f}",
+					'% Wet': "100.00",  # Normalized % Wet always sums to 100%
+					'Indeks Bahan (%)': f"{total_indeks:.2f}",
+					'TPH': f"{total_tph:.1f}",
+					'HPP (Rp/t)': '-',
+					'Cost (Rp/h)': f"{total_cost:,.0f}"
+				})
+		
+		if summary_data:
+			pd.DataFrame(summary_data).to_excel(writer, sheet_name='Optimal_Proportions', index=False)
+			
+			# Add metadata sheet
+			metadata = [
+				{'Property': 'Report Generated', 'Value': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+				{'Property': 'Application', 'Value': 'Raw Mix Design Optimizer'},
+				{'Property': 'Optimization Status', 'Value': 'Success' if results.get('status') == 1 else 'Failed'},
+				{'Property': 'Total Materials', 'Value': len(summary_data)},
+				{'Property': 'Total Cost (Rp/h)', 'Value': f"{sum(float(row['Cost (Rp/h)'].replace(',', '')) for row in summary_data):,.0f}"},
+				# Matching fingerprints mean identical inputs and results
+				{'Property': 'Input Fingerprint', 'Value': f"{state_hash}:{results_hash}"}
+			]
+			pd.DataFrame(metadata).to_excel(writer, sheet_name='Report_Info', index=False)
 		
-		with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-			# Summary sheet
-			summary_data = []
-			if results and results.get("status") == 1:
-				sol = results.get("solution", {})
+		# Results Tab - Composition Analysis
+		if has_details:
+			try:
 				g = state.get("general", {})
-				rm_df = state.get('rm_df')
+				derived = _report_derived(state, results, state_hash, results_hash)
+				stages = derived["stages"]
 				
-				# Calculate H2O_Rawmeal (weighted average) for Indeks Bahan calculation
-				h2o_rawmeal = 0.0
-				if rm_df is not None and not rm_df.empty:
-					for material, percentage in sol.items():
-						if percentage is not None:
-							for _, row in rm_df.iterrows():
-								if str(row.get('Material', '')).strip() == material:
-									h2o_material = float(row.get('H2O', 0.0) or 0.0)
-									h2o_rawmeal += (percentage / 100.0) * h2o_material
-									break
+				# Composition Analysis Sheet
+				composition_data = []
+				oxides = ['H2O', 'LOI', 'SiO2', 'Al2O3', 'Fe2O3', 'CaO', 'MgO', 'K2O', 'Na2O', 'SO3', 'Cl']
 				
-				# Add solution data with Indeks Bahan calculation
-				indeks_bahan_values = []  # Store for % Wet normalization
+				for oxide in oxides:
+					raw_meal_val = stages["raw_meal"].get(oxide, 0)
+					kiln_feed_val = stages["kiln_feed"].get(oxide, 0)
+					unignited_val = stages["unignited"].get(oxide, 0)
+					clinker_val = stages["clinker"].get(oxide, 0)
+					
+					composition_data.append({
+						'Oxide': oxide,
+						'Raw Meal (%)': f"{raw_meal_val:.2f}",
+						'Kiln Feed (%)': f"{kiln_feed_val:.2f}",
+						'Unignited (%)': f"{unignited_val:.2f}",
+						'Clinker (%)': f"{clinker_val:.2f}"
+					})
 				
-				# First pass: calculate all Indeks Bahan values
-				for material, percentage in sol.items():
-					if percentage is not None:
-						tph = (percentage/100) * g.get('tonKF', 533.0)
-						# Find HPP and H2O for cost and Indeks Bahan calculation
-						hpp = 0
-						h2o_material = 0.0
-						if rm_df is not None and not rm_df.empty:
-							for _, row in rm_df.iterrows():
-								if str(row.get('Material', '')).strip() == material:
-									hpp = float(row.get('HPP', 0) or 0)
-									h2o_material = float(row.get('H2O', 0.0) or 0.0)
-									break
-						
-						# Calculate Indeks Bahan using the formula:
-						# Indeks Bahan = Proporsi Dry [%] * (100-H2O Rawmeal)/(100-H2O Raw Mix)
-						indeks_bahan = 0.0
-						if (100 - h2o_material) > 0:  # Avoid division by zero
-							indeks_bahan = percentage * (100 - h2o_rawmeal) / (100 - h2o_material)
-						
-						indeks_bahan_values.append((material, percentage, indeks_bahan, tph, hpp))
+				pd.DataFrame(composition_data).to_excel(writer, sheet_name='Composition_Analysis', index=False)
 				
-				# Calculate total Indeks Bahan for % Wet normalization
-				total_indeks_bahan = sum(item[2] for item in indeks_bahan_values)
+				# Quality Moduli Sheet
+				rm_moduli = derived["moduli"]["raw_meal"]
+				kf_moduli = derived["moduli"]["kiln_feed"]
+				un_moduli = derived["moduli"]["unignited"]
+				cl_moduli = derived["moduli"]["clinker"]
 				
-				# Second pass: create summary data with % Wet column
-				for material, percentage, indeks_bahan, tph, hpp in indeks_bahan_values:
-					# Calculate % Wet (normalized Indeks Bahan)
-					percent_wet = (indeks_bahan / total_indeks_bahan * 100) if total_indeks_bahan > 0 else 0.0
-					
-					cost_per_hour = tph * hpp
-					summary_data.append({
-						'Material': material,
-						'% Dry': f"{percentage:.2f}",
-						'% Wet': f"{percent_wet:.2f}",
-						'Indeks Bahan (%)': f"{indeks_bahan:.2f}",
-						'TPH': f"{tph:.1f}",
-						'HPP (Rp/t)': f"{hpp:,.0f}",
-						'Cost (Rp/h)': f"{cost_per_hour:,.0f}"
-					})
+				moduli_data = [
+					{
+						'Stage': 'Raw Meal',
+						'LSF': f"{rm_moduli['LSF']:.2f}",
+						'SM': f"{rm_moduli['SM']:.3f}",
+						'AM': f"{rm_moduli['AM']:.3f}",
+						'NaEq (%)': f"{rm_moduli['NaEq']:.3f}"
+					},
+					{
+						'Stage': 'Kiln Feed',
+						'LSF': f"{kf_moduli['LSF']:.2f}",
+						'SM': f"{kf_moduli['SM']:.3f}",
+						'AM': f"{kf_moduli['AM']:.3f}",
+						'NaEq (%)': f"{kf_moduli['NaEq']:.3f}"
+					},
+					{
+						'Stage': 'Unignited',
+						'LSF': f"{un_moduli['LSF']:.2f}",
+						'SM': f"{un_moduli['SM']:.3f}",
+						'AM': f"{un_moduli['AM']:.3f}",
+						'NaEq (%)': f"{un_moduli['NaEq']:.3f}"
+					},
+					{
+						'Stage': 'Clinker',
+						'LSF': f"{cl_moduli['LSF']:.2f}",
+						'SM': f"{cl_moduli['SM']:.3f}",
+						'AM': f"{cl_moduli['AM']:.3f}",
+						'NaEq (%)': f"{cl_moduli['NaEq']:.3f}"
+					}
+				]
 				
-				# Add TOTAL row to Excel export
-				if summary_data:
-					total_percentage = sum(float(row['% Dry']) for row in summary_data)
-					total_cost = sum(float(row['Cost (Rp/h)'].replace(',', '')) for row in summary_data)
-					total_indeks = sum(float(row['Indeks Bahan (%)']) for row in summary_data)
-					total_tph = g.get('tonKF', 533.0)
-					
-					summary_data.append({
-						'Material': 'TOTAL',
-						'% Dry': f"{total_percentage:.2f}",
-						'% Wet': "100.00",  # Normalized % Wet always sums to 100%
-						'Indeks Bahan (%)': f"{total_indeks:.2f}",
-						'TPH': f"{total_tph:.1f}",
-						'HPP (Rp/t)': '-',
-						'Cost (Rp/h)': f"{total_cost:,.0f}"
-					})
-			
-			if summary_data:
-				pd.DataFrame(summary_data).to_excel(writer, sheet_name='Optimal_Proportions', index=False)
+				pd.DataFrame(moduli_data).to_excel(writer, sheet_name='Quality_Moduli', index=False)
 				
-				# Add metadata sheet
-				metadata = [
-					{'Property': 'Report Generated', 'Value': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
-					{'Property': 'Application', 'Value': 'Raw Mix Design Optimizer'},
-					{'Property': 'Optimization Status', 'Value': 'Success' if results.get('status') == 1 else 'Failed'},
-					{'Property': 'Total Materials', 'Value': len(summary_data)},
-					{'Property': 'Total Cost (Rp/h)', 'Value': f"{sum(float(row['Cost (Rp/h)'].replace(',', '')) for row in summary_data):,.0f}"}
+				# Bogue Phases Sheet
+				bogue = derived["bogue"]
+				bogue_data = [
+					{'Phase': 'C3S', 'Percentage (%)': f"{bogue['C3S']:.2f}"},
+					{'Phase': 'C2S', 'Percentage (%)': f"{bogue['C2S']:.2f}"},
+					{'Phase': 'C3A', 'Percentage (%)': f"{bogue['C3A']:.2f}"},
+					{'Phase': 'C4AF', 'Percentage (%)': f"{bogue['C4AF']:.2f}"}
 				]
-				pd.DataFrame(metadata).to_excel(writer, sheet_name='Report_Info', index=False)
-			
-			# Results Tab - Composition Analysis
-			if results and results.get("status") == 1:
-				try:
-					from core.compute import calculate_all_stages, calculate_quality_moduli, compute_bogue
-					
-					if sol and state.get("rm_dict"):
-						g = state.get("general", {})
-						dust = state.get("dust", {})
-						ash_comp = results.get("ash_comp", {})
-						RM = state.get("rm_dict", {})
-						
-						# Calculate all stages
-						stages = calculate_all_stages(
-							RM=RM,
-							x_percent=sol,
-							dust=dust,
-							pSilo=g.get("pSilo", 10.0) / 100.0,
-							pKiln=g.get("pKiln", 0.0) / 100.0,
-							tonKF=g.get("tonKF", 533.0),
-							clinker_tph=g.get("clinker_tph", 342.0),
-							dust_ratio=g.get("dust_ratio", 3.0) / 100.0,
-							ASH=ash_comp,
-							FCaO_cl=g.get("fcao", 1.0)
-						)
-						
-						# Composition Analysis Sheet
-						composition_data = []
-						oxides = ['H2O', 'LOI', 'SiO2', 'Al2O3', 'Fe2O3', 'CaO', 'MgO', 'K2O', 'Na2O', 'SO3', 'Cl']
-						
-						for oxide in oxides:
-							raw_meal_val = stages["raw_meal"].get(oxide, 0)
-							kiln_feed_val = stages["kiln_feed"].get(oxide, 0)
-							unignited_val = stages["unignited"].get(oxide, 0)
-							clinker_val = stages["clinker"].get(oxide, 0)
-							
-							composition_data.append({
-								'Oxide': oxide,
-								'Raw Meal (%)': f"{raw_meal_val:.2f}",
-								'Kiln Feed (%)': f"{kiln_feed_val:.2f}",
-								'Unignited (%)': f"{unignited_val:.2f}",
-								'Clinker (%)': f"{clinker_val:.2f}"
-							})
-						
-						pd.DataFrame(composition_data).to_excel(writer, sheet_name='Composition_Analysis', index=False)
-						
-						# Quality Moduli Sheet
-						rm_moduli = calculate_quality_moduli(stages["raw_meal"])
-						kf_moduli = calculate_quality_moduli(stages["kiln_feed"])
-						un_moduli = calculate_quality_moduli(stages["unignited"])
-						cl_moduli = calculate_quality_moduli(stages["clinker"])
-						
-						moduli_data = [
-							{
-								'Stage': 'Raw Meal',
-								'LSF': f"{rm_moduli['LSF']:.2f}",
-								'SM': f"{rm_moduli['SM']:.3f}",
-								'AM': f"{rm_moduli['AM']:.3f}",
-								'NaEq (%)': f"{rm_moduli['NaEq']:.3f}"
-							},
-							{
-								'Stage': 'Kiln Feed',
-								'LSF': f"{kf_moduli['LSF']:.2f}",
-								'SM': f"{kf_moduli['SM']:.3f}",
-								'AM': f"{kf_moduli['AM']:.3f}",
-								'NaEq (%)': f"{kf_moduli['NaEq']:.3f}"
-							},
-							{
-								'Stage': 'Unignited',
-								'LSF': f"{un_moduli['LSF']:.2f}",
-								'SM': f"{un_moduli['SM']:.3f}",
-								'AM': f"{un_moduli['AM']:.3f}",
-								'NaEq (%)': f"{un_moduli['NaEq']:.3f}"
-							},
-							{
-								'Stage': 'Clinker',
-								'LSF': f"{cl_moduli['LSF']:.2f}",
-								'SM': f"{cl_moduli['SM']:.3f}",
-								'AM': f"{cl_moduli['AM']:.3f}",
-								'NaEq (%)': f"{cl_moduli['NaEq']:.3f}"
-							}
-						]
-						
-						pd.DataFrame(moduli_data).to_excel(writer, sheet_name='Quality_Moduli', index=False)
-						
-						# Bogue Phases Sheet
-						bogue = compute_bogue(stages["clinker"], FCaO=g.get("fcao", 1.0))
-						bogue_data = [
-							{'Phase': 'C3S', 'Percentage (%)': f"{bogue['C3S']:.2f}"},
-							{'Phase': 'C2S', 'Percentage (%)': f"{bogue['C2S']:.2f}"},
-							{'Phase': 'C3A', 'Percentage (%)': f"{bogue['C3A']:.2f}"},
-							{'Phase': 'C4AF', 'Percentage (%)': f"{bogue['C4AF']:.2f}"}
-						]
-						
-						pd.DataFrame(bogue_data).to_excel(writer, sheet_name='Bogue_Phases', index=False)
-						
-						# Process Information Sheet
-						dust_tph = g.get('dust_ratio', 3.0) / 100.0 * g.get('clinker_tph', 342.0)
-						total_fuel_tph = results.get('total_fuel_tph', 0)
-						total_ash_tph = results.get('total_ash_tph', 0)
-						alternative_fuel_heat_pct = results.get('alternative_fuel_heat_pct', 0)
-						cv_total = results.get('cv_total', 0)
-						
-						# Calculate dust scenarios
-						pSilo = g.get('pSilo', 0.0) / 100.0
-						pKiln = g.get('pKiln', 0.0) / 100.0
-						tonKF = g.get('tonKF', 533.0)
-						
-						dust_to_silo_tph = 0
-						dust_to_kiln_tph = 0
-						
-						if pSilo > 0:
-							# Estimate raw meal TPH from kiln feed
-							estimated_rm_tph = tonKF / (1 - pSilo)
-							dust_to_silo_tph = pSilo * estimated_rm_tph
-						elif pKiln > 0:
-							dust_to_kiln_tph = pKiln * tonKF
-						
-						process_info_data = [
-							{'Parameter': 'STEC', 'Value': f"{g.get('stec', 0):.1f}", 'Unit': 'kcal/kg'},
-							{'Parameter': 'Clinker Production', 'Value': f"{g.get('clinker_tph', 0):.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'Kiln Feed', 'Value': f"{tonKF:.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'Dust Ratio', 'Value': f"{g.get('dust_ratio', 0):.1f}", 'Unit': '%'},
-							{'Parameter': 'Dust Loss', 'Value': f"{dust_tph:.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'Dust to Silo', 'Value': f"{g.get('pSilo', 0):.1f}", 'Unit': '%'},
-							{'Parameter': 'Dust to Silo TPH', 'Value': f"{dust_to_silo_tph:.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'Dust to Kiln', 'Value': f"{g.get('pKiln', 0):.1f}", 'Unit': '%'},
-							{'Parameter': 'Dust to Kiln TPH', 'Value': f"{dust_to_kiln_tph:.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'Free Lime Clinker', 'Value': f"{g.get('fcao', 0):.1f}", 'Unit': '%'},
-							{'Parameter': 'Total Fuel', 'Value': f"{total_fuel_tph:.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'Total Ash', 'Value': f"{total_ash_tph:.1f}", 'Unit': 'TPH'},
-							{'Parameter': 'CV Total', 'Value': f"{cv_total:.0f}", 'Unit': 'kcal/kg'},
-							{'Parameter': 'Fine Coal Heat', 'Value': f"{100 - alternative_fuel_heat_pct:.1f}", 'Unit': '%'},
-							{'Parameter': 'Alternative Fuel Heat', 'Value': f"{alternative_fuel_heat_pct:.1f}", 'Unit': '%'}
-						]
-						
-						pd.DataFrame(process_info_data).to_excel(writer, sheet_name='Process_Information', index=False)
-					
-				except Exception as e:
-					print(f"Warning: Could not generate detailed results: {str(e)}")
-			
-			# Input parameters sheet
-			params_data = []
-			g = state.get("general", {})
-			for key, value in g.items():
-				if key not in ["manual_dust_control"]:
-					params_data.append({'Parameter': key, 'Value': str(value)})
-			
-			if params_data:
-				pd.DataFrame(params_data).to_excel(writer, sheet_name='Input_Parameters', index=False)
-			
-			# Raw materials sheet
-			rm_df = state.get('rm_df')
-			if rm_df is not None and not rm_df.empty:
-				rm_df.to_excel(writer, sheet_name='Raw_Materials', index=False)
-			
-			# Fuel data sheet
-			fuel_rows = state.get('fuel_rows', [])
-			if fuel_rows:
-				pd.DataFrame(fuel_rows).to_excel(writer, sheet_name='Fuel_Data', index=False)
+				
+				pd.DataFrame(bogue_data).to_excel(writer, sheet_name='Bogue_Phases', index=False)
+				
+				# Process Information Sheet
+				dust_tph = g.get('dust_ratio', 3.0) / 100.0 * g.get('clinker_tph', 342.0)
+				total_fuel_tph = results.get('total_fuel_tph', 0)
+				total_ash_tph = results.get('total_ash_tph', 0)
+				alternative_fuel_heat_pct = results.get('alternative_fuel_heat_pct', 0)
+				cv_total = results.get('cv_total', 0)
+				
+				# Calculate dust scenarios
+				pSilo = g.get('pSilo', 0.0) / 100.0
+				pKiln = g.get('pKiln', 0.0) / 100.0
+				tonKF = g.get('tonKF', 533.0)
+				
+				dust_to_silo_tph = 0
+				dust_to_kiln_tph = 0
+				
+				if pSilo > 0:
+					# Estimate raw meal TPH from kiln feed
+					estimated_rm_tph = tonKF / (1 - pSilo)
+					dust_to_silo_tph = pSilo * estimated_rm_tph
+				elif pKiln > 0:
+					dust_to_kiln_tph = pKiln * tonKF
+				
+				process_info_data = [
+					{'Parameter': 'STEC', 'Value': f"{g.get('stec', 0):.1f}", 'Unit': 'kcal/kg'},
+					{'Parameter': 'Clinker Production', 'Value': f"{g.get('clinker_tph', 0):.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'Kiln Feed', 'Value': f"{tonKF:.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'Dust Ratio', 'Value': f"{g.get('dust_ratio', 0):.1f}", 'Unit': '%'},
+					{'Parameter': 'Dust Loss', 'Value': f"{dust_tph:.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'Dust to Silo', 'Value': f"{g.get('pSilo', 0):.1f}", 'Unit': '%'},
+					{'Parameter': 'Dust to Silo TPH', 'Value': f"{dust_to_silo_tph:.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'Dust to Kiln', 'Value': f"{g.get('pKiln', 0):.1f}", 'Unit': '%'},
+					{'Parameter': 'Dust to Kiln TPH', 'Value': f"{dust_to_kiln_tph:.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'Free Lime Clinker', 'Value': f"{g.get('fcao', 0):.1f}", 'Unit': '%'},
+					{'Parameter': 'Total Fuel', 'Value': f"{total_fuel_tph:.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'Total Ash', 'Value': f"{total_ash_tph:.1f}", 'Unit': 'TPH'},
+					{'Parameter': 'CV Total', 'Value': f"{cv_total:.0f}", 'Unit': 'kcal/kg'},
+					{'Parameter': 'Fine Coal Heat', 'Value': f"{100 - alternative_fuel_heat_pct:.1f}", 'Unit': '%'},
+					{'Parameter': 'Alternative Fuel Heat', 'Value': f"{alternative_fuel_heat_pct:.1f}", 'Unit': '%'}
+				]
+				
+				pd.DataFrame(process_info_data).to_excel(writer, sheet_name='Process_Information', index=False)
 			
-			# Constraints sheet
-			constraints = state.get('constraints', {})
-			if constraints:
-				constraints_data = [{'Constraint': k, 'Value': v} for k, v in constraints.items()]
-				pd.DataFrame(constraints_data).to_excel(writer, sheet_name='Constraints', index=False)
+			except Exception as e:
+				print(f"Warning: Could not generate detailed results: {str(e)}")
+		
+		# Input parameters sheet
+		params_data = [{'Parameter': key, 'Value': str(value)} for key, value in state.get("general", {}).items() if key != "manual_dust_control"]
+		
+		if params_data:
+			pd.DataFrame(params_data).to_excel(writer, sheet_name='Input_Parameters', index=False)
+		
+		# Raw materials sheet
+		rm_df = state.get('rm_df')
+		if rm_df is not None and not rm_df.empty:
+			rm_df.to_excel(writer, sheet_name='Raw_Materials', index=False)
+		
+		# Fuel data sheet
+		fuel_rows = state.get('fuel_rows', [])
+		if fuel_rows:
+			pd.DataFrame(fuel_rows).to_excel(writer, sheet_name='Fuel_Data', index=False)
 		
-		output.seek(0)
-		return output.getvalue()
+		# Constraints sheet
+		constraints = state.get('constraints', {})
+		if constraints:
+			constraints_data = [{'Constraint': k, 'Value': v} for k, v in constraints.items()]
+			pd.DataFrame(constraints_data).to_excel(writer, sheet_name='Constraints', index=False)
 	
-	except Exception as e:
-		st.error(f"Error creating Excel report: {str(e)}")
-		return None
+	output.seek(0)
+	return output.getvalue()
 
-def create_pdf_report(state, results):
-	"""Create comprehensive PDF report"""
-	try:
-		buffer = io.BytesIO()
-		doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.5*inch, rightMargin=0.5*inch)
-		styles = getSampleStyleSheet()
-		story = []
-		
-		# Title
-		title_style = ParagraphStyle(
+@st.cache_resource
+def _pdf_styles():
+	"""Paragraph and table styles shared by every PDF report"""
+	from reportlab.platypus import TableStyle
+	from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+	from reportlab.lib import colors
+	
+	styles = getSampleStyleSheet()
+	return {
+		'sheet': styles,
+		'title': ParagraphStyle(
 			'CustomTitle',
 			parent=styles['Heading1'],
 			fontSize=18,
 			alignment=1  # Center alignment
-		)
-		story.append(Paragraph("Raw Mix Design Optimization Report", title_style))
+		),
+		'proportions': TableStyle([
+			('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+			('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+			('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+			('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+			('FONTSIZE', (0, 0), (-1, 0), 10),
+			('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+			('BACKGROUND', (0, 1), (-1, -2), colors.beige),
+			('BACKGROUND', (0, -1), (-1, -1), colors.lightblue),  # Total row
+			('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+			('GRID', (0, 0), (-1, -1), 1, colors.black)
+		]),
+		'process': TableStyle([
+			('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+			('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+			('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+			('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+			('FONTSIZE', (0, 0), (-1, 0), 10),
+			('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+			('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+			('GRID', (0, 0), (-1, -1), 1, colors.black)
+		]),
+		'moduli': TableStyle([
+			('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+			('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+			('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+			('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+			('FONTSIZE', (0, 0), (-1, 0), 10),
+			('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+			('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
+			('GRID', (0, 0), (-1, -1), 1, colors.black)
+		])
+	}
+
+def _render_pdf_report(state, results, state_hash, results_hash):
+	"""Create comprehensive PDF report"""
+	# ReportLab is only loaded once a PDF is actually requested
+	from reportlab.lib.pagesizes import A4
+	from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+	from reportlab.lib.units import inch
+	
+	buffer = io.BytesIO()
+	# Compress page streams explicitly rather than relying on rl_config defaults
+	doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.5*inch, rightMargin=0.5*inch, pageCompression=1)
+	pdf_styles = _pdf_styles()
+	styles = pdf_styles['sheet']
+	story = []
+	
+	# Title
+	story.append(Paragraph("Raw Mix Design Optimization Report", pdf_styles['title']))
+	story.append(Spacer(1, 20))
+	
+	# Timestamp and status
+	timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+	story.append(Paragraph(f"Generated: {timestamp}", styles['Normal']))
+	if results and results.get("status") == 1:
+		story.append(Paragraph("Status: ✅ Optimization Successful", styles['Normal']))
+	else:
+		story.append(Paragraph("Status: ❌ Optimization Failed", styles['Normal']))
+	story.append(Spacer(1, 20))
+	
+	if results and results.get("status") == 1:
+		sol = results.get("solution", {})
+		g = state.get("general", {})
+		
+		# Optimal Proportions
+		story.append(Paragraph("Optimal Raw Mix Proportions", styles['Heading2']))
+		
+		# Calculate H2O_Rawmeal for Indeks Bahan calculation (use user-entered value)
+		h2o_rawmeal = g.get('h2o_rawmeal', 0.50)  # Use user-entered value from General tab
+		rm_lookup = _state_materials_index(state)  # Material HPP and H2O values
+		
+		materials, pct, wet, indeks, tph, hpp, cost = _proportion_arrays(sol, rm_lookup, g.get('tonKF', 533.0), h2o_rawmeal)
+		total_cost = cost.sum()
+		total_indeks_bahan = indeks.sum()
+		prop_data = [['Material', '% Dry', '% Wet', 'Indeks Bahan (%)', 'TPH', 'Cost (Rp/h)']]
+		prop_data += [
+			[m, f"{p:.2f}", f"{w:.2f}", f"{ib:.2f}", f"{t:.1f}", f"{c:,.0f}"]
+			for m, p, w, ib, t, c in zip(materials, pct, wet, indeks, tph, cost)
+		]
+		
+		# Add total row with calculated Indeks Bahan total
+		total_percentage = sum(percentage for percentage in sol.values() if percentage is not None)
+		prop_data.append(['TOTAL', f"{total_percentage:.2f}", "100.00", f"{total_indeks_bahan:.2f}", f"{g.get('tonKF', 533.0):.1f}", f"{total_cost:,.0f}"])
+		
+		table = Table(prop_data, colWidths=[1.5*inch, 1.0*inch, 1.0*inch, 1.2*inch, 1.0*inch, 1.3*inch])
+		table.setStyle(pdf_styles['proportions'])
+		story.append(table)
 		story.append(Spacer(1, 20))
 		
-		# Timestamp and status
-		timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-		story.append(Paragraph(f"Generated: {timestamp}", styles['Normal']))
-		if results and results.get("status") == 1:
-			story.append(Paragraph("Status: ✅ Optimization Successful", styles['Normal']))
-		else:
-			story.append(Paragraph("Status: ❌ Optimization Failed", styles['Normal']))
+		# Process Information
+		story.append(Paragraph("Process Information", styles['Heading2']))
+		process_data = [
+			['Parameter', 'Value', 'Unit'],
+			['STEC', f"{g.get('stec', 0):.1f}", 'kcal/kg'],
+			['Clinker Production', f"{g.get('clinker_tph', 0):.1f}", 'TPH'],
+			['Kiln Feed', f"{g.get('tonKF', 0):.1f}", 'TPH'],
+			['Dust Ratio', f"{g.get('dust_ratio', 0):.1f}", '%'],
+			['Dust to Silo', f"{g.get('pSilo', 0):.1f}", '%'],
+			['Dust to Kiln', f"{g.get('pKiln', 0):.1f}", '%'],
+			['Free Lime Clinker', f"{g.get('fcao', 0):.1f}", '%']
+		]
+		
+		# Add fuel information if available
+		if results.get('total_fuel_tph'):
+			process_data.extend([
+				['Total Fuel', f"{results.get('total_fuel_tph', 0):.1f}", 'TPH'],
+				['Total Ash', f"{results.get('total_ash_tph', 0):.1f}", 'TPH'],
+				['Alt. Fuel Heat', f"{results.get('alternative_fuel_heat_pct', 0):.1f}", '%']
+			])
+		
+		process_table = Table(process_data, colWidths=[2.5*inch, 1.5*inch, 1*inch])
+		process_table.setStyle(pdf_styles['process'])
+		story.append(process_table)
 		story.append(Spacer(1, 20))
 		
-		if results and results.get("status") == 1:
-			sol = results.get("solution", {})
-			g = state.get("general", {})
-			
-			# Optimal Proportions
-			story.append(Paragraph("Optimal Raw Mix Proportions", styles['Heading2']))
-			
-			# Calculate H2O_Rawmeal for Indeks Bahan calculation (use user-entered value)
-			h2o_rawmeal = g.get('h2o_rawmeal', 0.50)  # Use user-entered value from General tab
-			rm_df = state.get('rm_df')  # Get rm_df for material H2O values
-			
-			prop_data = [['Material', '% Dry', '% Wet', 'Indeks Bahan (%)', 'TPH', 'Cost (Rp/h)']]
-			total_cost = 0
-			indeks_bahan_values = []  # Store for % Wet normalization
-			
-			# First pass: calculate all Indeks Bahan values
-			for material, percentage in sol.items():
-				if percentage is not None:
-					tph = (percentage/100) * g.get('tonKF', 533.0)
-					# Find HPP and H2O for cost and Indeks Bahan calculation
-					hpp = 0
-					h2o_material = 0.0
-					if rm_df is not None and not rm_df.empty:
-						for _, row in rm_df.iterrows():
-							if str(row.get('Material', '')).strip() == material:
-								hpp = float(row.get('HPP', 0) or 0)
-								h2o_material = float(row.get('H2O', 0.0) or 0.0)
-								break
-					
-					# Calculate Indeks Bahan using the formula:
-					# Indeks Bahan = Proporsi Dry [%] * (100-H2O Rawmeal)/(100-H2O Raw Mix)
-					indeks_bahan = 0.0
-					if (100 - h2o_material) > 0:  # Avoid division by zero
-						indeks_bahan = percentage * (100 - h2o_rawmeal) / (100 - h2o_material)
-					
-					indeks_bahan_values.append((material, percentage, indeks_bahan, tph, hpp))
-			
-			# Calculate total Indeks Bahan for % Wet normalization
-			total_indeks_bahan = sum(item[2] for item in indeks_bahan_values)
-			
-			# Second pass: create prop_data with % Wet column
-			for material, percentage, indeks_bahan, tph, hpp in indeks_bahan_values:
-				# Calculate % Wet (normalized Indeks Bahan)
-				percent_wet = (indeks_bahan / total_indeks_bahan * 100) if total_indeks_bahan > 0 else 0.0
+		# Quality Moduli Summary (if available)
+		try:
+			if state.get("rm_dict"):
+				moduli = _report_derived(state, results, state_hash, results_hash)["moduli"]
 				
-				cost_per_hour = tph * hpp
-				total_cost += cost_per_hour
-				prop_data.append([material, f"{percentage:.2f}", f"{percent_wet:.2f}", f"{indeks_bahan:.2f}", f"{tph:.1f}", f"{cost_per_hour:,.0f}"])
-			
-			# Add total row with calculated Indeks Bahan total
-			total_percentage = sum(percentage for percentage in sol.values() if percentage is not None)
-			prop_data.append(['TOTAL', f"{total_percentage:.2f}", "100.00", f"{total_indeks_bahan:.2f}", f"{g.get('tonKF', 533.0):.1f}", f"{total_cost:,.0f}"])
-			
-			table = Table(prop_data, colWidths=[1.5*inch, 1.0*inch, 1.0*inch, 1.2*inch, 1.0*inch, 1.3*inch])
-			table.setStyle(TableStyle([
-				('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-				('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-				('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-				('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-				('FONTSIZE', (0, 0), (-1, 0), 10),
-				('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-				('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-				('BACKGROUND', (0, -1), (-1, -1), colors.lightblue),  # Total row
-				('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-				('GRID', (0, 0), (-1, -1), 1, colors.black)
-			]))
-			story.append(table)
-			story.append(Spacer(1, 20))
-			
-			# Process Information
-			story.append(Paragraph("Process Information", styles['Heading2']))
-			process_data = [
-				['Parameter', 'Value', 'Unit'],
-				['STEC', f"{g.get('stec', 0):.1f}", 'kcal/kg'],
-				['Clinker Production', f"{g.get('clinker_tph', 0):.1f}", 'TPH'],
-				['Kiln Feed', f"{g.get('tonKF', 0):.1f}", 'TPH'],
-				['Dust Ratio', f"{g.get('dust_ratio', 0):.1f}", '%'],
-				['Dust to Silo', f"{g.get('pSilo', 0):.1f}", '%'],
-				['Dust to Kiln', f"{g.get('pKiln', 0):.1f}", '%'],
-				['Free Lime Clinker', f"{g.get('fcao', 0):.1f}", '%']
-			]
-			
-			# Add fuel information if available
-			if results.get('total_fuel_tph'):
-				process_data.extend([
-					['Total Fuel', f"{results.get('total_fuel_tph', 0):.1f}", 'TPH'],
-					['Total Ash', f"{results.get('total_ash_tph', 0):.1f}", 'TPH'],
-					['Alt. Fuel Heat', f"{results.get('alternative_fuel_heat_pct', 0):.1f}", '%']
-				])
-			
-			process_table = Table(process_data, colWidths=[2.5*inch, 1.5*inch, 1*inch])
-			process_table.setStyle(TableStyle([
-				('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-				('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-				('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-				('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-				('FONTSIZE', (0, 0), (-1, 0), 10),
-				('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-				('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-				('GRID', (0, 0), (-1, -1), 1, colors.black)
-			]))
-			story.append(process_table)
-			story.append(Spacer(1, 20))
-			
-			# Quality Moduli Summary (if available)
-			try:
-				from core.compute import calculate_all_stages, calculate_quality_moduli
-				if state.get("rm_dict"):
-					dust = state.get("dust", {})
-					ash_comp = results.get("ash_comp", {})
-					RM = state.get("rm_dict", {})
-					
-					stages = calculate_all_stages(
-						RM=RM, x_percent=sol, dust=dust,
-						pSilo=g.get("pSilo", 10.0) / 100.0,
-						pKiln=g.get("pKiln", 0.0) / 100.0,
-						tonKF=g.get("tonKF", 533.0),
-						clinker_tph=g.get("clinker_tph", 342.0),
-						dust_ratio=g.get("dust_ratio", 3.0) / 100.0,
-						ASH=ash_comp, FCaO_cl=g.get("fcao", 1.0)
-					)
-					
-					moduli_data = [['Stage', 'LSF', 'SM', 'AM', 'NaEq']]
-					for stage_name, composition in [('Raw Meal', stages['raw_meal']), ('Kiln Feed', stages['kiln_feed']), ('Clinker', stages['clinker'])]:
-						moduli = calculate_quality_moduli(composition)
-						moduli_data.append([
-							stage_name,
-							f"{moduli['LSF']:.1f}",
-							f"{moduli['SM']:.2f}",
-							f"{moduli['AM']:.2f}",
-							f"{moduli['NaEq']:.3f}"
-						])
-					
-					story.append(Paragraph("Quality Moduli Summary", styles['Heading2']))
-					moduli_table = Table(moduli_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
-					moduli_table.setStyle(TableStyle([
-						('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-						('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-						('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-						('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-						('FONTSIZE', (0, 0), (-1, 0), 10),
-						('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-						('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
-						('GRID', (0, 0), (-1, -1), 1, colors.black)
-					]))
-					story.append(moduli_table)
-			except:
-				pass  # Skip if moduli calculation fails
-			
-		else:
-			story.append(Paragraph("No optimization results available.", styles['Normal']))
-			story.append(Paragraph("Please run the calculation first.", styles['Normal']))
-		
-		# Footer
-		story.append(Spacer(1, 30))
-		story.append(Paragraph("Generated by Raw Mix Design Optimizer", styles['Italic']))
+				moduli_data = [['Stage', 'LSF', 'SM', 'AM', 'NaEq']]
+				for stage_name, stage_key in [('Raw Meal', 'raw_meal'), ('Kiln Feed', 'kiln_feed'), ('Clinker', 'clinker')]:
+					stage_moduli = moduli[stage_key]
+					moduli_data.append([
+						stage_name,
+						f"{stage_moduli['LSF']:.1f}",
+						f"{stage_moduli['SM']:.2f}",
+						f"{stage_moduli['AM']:.2f}",
+						f"{stage_moduli['NaEq']:.3f}"
+					])
+				
+				story.append(Paragraph("Quality Moduli Summary", styles['Heading2']))
+				moduli_table = Table(moduli_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
+				moduli_table.setStyle(pdf_styles['moduli'])
+				story.append(moduli_table)
+		except:
+			pass  # Skip if moduli calculation fails
 		
-		doc.build(story)
-		buffer.seek(0)
-		return buffer.getvalue()
+	else:
+		story.append(Paragraph("No optimization results available.", styles['Normal']))
+		story.append(Paragraph("Please run the calculation first.", styles['Normal']))
 	
-	except Exception as e:
-		st.error(f"Error creating PDF report: {str(e)}")
+	# Footer
+	story.append(Spacer(1, 30))
+	story.append(Paragraph("Generated by Raw Mix Design Optimizer", styles['Italic']))
+	
+	doc.build(story)
+	return buffer.getvalue()
+
+def _results_hash(results):
+	"""Hash solver results for report caching"""
+	return _section_digest(results).hex()
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=300)
+def _build_excel_report(state_hash, results_hash, _state, _results):
+	"""Cached Excel report keyed on state and results hashes"""
+	return _render_excel_report(_state, _results, state_hash, results_hash)
+
+def _pdf_key(state_hash, results):
+	"""Cache key covering only the results fields the PDF report reads"""
+	if state_hash is None:
 		return None
+	# ash_comp feeds the moduli section through _report_derived
+	printed = {k: results.get(k) for k in ("status", "solution", "total_fuel_tph", "total_ash_tph", "alternative_fuel_heat_pct", "ash_comp")}
+	return state_hash + ":" + _section_digest(printed).hex()
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=300)
+def _build_pdf_report(pdf_key, _state, _results, _state_hash, _results_hash):
+	"""Cached PDF report keyed on the PDF inputs"""
+	return _render_pdf_report(_state, _results, _state_hash, _results_hash)
+
+def create_excel_report(state, results, state_hash, results_hash):
+	"""Create comprehensive Excel report; the hashes come from the script thread"""
+	if state_hash is None:
+		return _render_excel_report(state, results, state_hash, results_hash)
+	return _build_excel_report(state_hash, results_hash, state, results)
+
+def create_pdf_report(state, results, state_hash, results_hash):
+	"""Create comprehensive PDF report; the hashes come from the script thread"""
+	pdf_key = _pdf_key(state_hash, results)
+	if pdf_key is None:
+		return _render_pdf_report(state, results, state_hash, results_hash)
+	return _build_pdf_report(pdf_key, state, results, state_hash, results_hash)
+
+def _start_report(build, *args):
+	"""Run one report build on its own thread, carrying this session's script context"""
+	future = Future()
+	def run():
+		try:
+			future.set_result(build(*args))
+		except Exception as e:
+			future.set_exception(e)
+	# A short-lived thread per build: the context (needed by st.cache_data) ends with it
+	thread = threading.Thread(target=run, name="report", daemon=True)
+	add_script_run_ctx(thread)
+	thread.start()
+	return future
+
+def _report_future(fmt, state, results):
+	"""Future for one report format, started the first time that format is requested"""
+	# Keys are computed here, so the worker never touches session state
+	state_hash, results_hash = calculate_state_hash(state, "report"), _results_hash(results)
+	key = (state_hash, results_hash)
+	futures = st.session_state.get("report_futures")
+	if futures is None or futures["key"] != key:
+		futures = {"key": key}
+		st.session_state.report_futures = futures
+	if fmt not in futures:
+		# Snapshot the sections the sidebar edits in place while the worker runs
+		snapshot = dict(state)
+		for section in ("general", "dust", "constraints"):
+			snapshot[section] = dict(state.get(section, {}))
+		snapshot["fuel_rows"] = list(state.get("fuel_rows", []))
+		
+		build = create_excel_report if fmt == "xlsx" else create_pdf_report
+		futures[fmt] = _start_report(build, snapshot, results, state_hash, results_hash)
+	return futures[fmt]
 
 # Load defaults
 DEFAULTS_PATH = Path("data/defaults.json")
-if DEFAULTS_PATH.exists():
-	defaults = json.loads(DEFAULTS_PATH.read_text(encoding="utf-8"))
-else:
-	defaults = {}
+
+@st.cache_resource
+def _load_defaults():
+	"""Parse defaults.json once per process"""
+	if DEFAULTS_PATH.exists():
+		return orjson.loads(DEFAULTS_PATH.read_bytes())
+	return {}
 
 # Initialize database and load project data
 if "state" not in st.session_state:
-	# Initialize with proper column names
+	# Session state is edited in place, so never hand out the shared cached dict
+	defaults = copy.deepcopy(_load_defaults())
+	
+	# Initialize with proper column names and dtypes
 	raw_mix_data = defaults.get("raw_mix_rows", [])
-	if raw_mix_data:
-		rm_df = pd.DataFrame(raw_mix_data, columns=[
-			"Material","H2O","LOI","SiO2","Al2O3","Fe2O3","CaO","MgO","K2O","Na2O","SO3","Cl","HPP","min%","max%"
-		])
-	else:
-		rm_df = pd.DataFrame(columns=[
-			"Material","H2O","LOI","SiO2","Al2O3","Fe2O3","CaO","MgO","K2O","Na2O","SO3","Cl","HPP","min%","max%"
-		])
+	rm_df = pd.DataFrame.from_records(raw_mix_data, columns=RAW_MIX_COLUMNS).astype(RAW_MIX_DTYPES)
 	
 	st.session_state.state = {
 		"general": defaults.get("general", {}),
@@ -773,19 +831,39 @@ if "current_project_id" in st.session_state:
 state = st.session_state.state
 
 # Function to calculate state hash for change detection
+def _section_digest(value):
+	"""Digest of one state section"""
+	payload = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=str)
+	return hashlib.blake2b(payload, digest_size=16).digest()
+
+def _rm_df_digest(rm_df):
+	"""Digest of the raw material table, reused while the same frame is in state"""
+	cached = st.session_state.get('rm_df_digest')
+	if cached is not None and cached[0] is rm_df:
+		return cached[1]
+	
+	digest = b''
+	if rm_df is not None and not rm_df.empty:
+		# Per-row uint64 hashes computed in C instead of pretty-printing the table
+		h = hashlib.blake2b(digest_size=16)
+		h.update(pd.util.hash_pandas_object(rm_df, index=False).values.tobytes())
+		h.update('|'.join(map(str, rm_df.columns)).encode())
+		digest = h.digest()
+	# Keep the frame itself so its id cannot be reused by another object
+	st.session_state.rm_df_digest = (rm_df, digest)
+	return digest
+
 def calculate_state_hash(state_data, mode):
 	"""Calculate hash of current state to detect changes"""
 	try:
-		# Create a simplified representation for hashing
-		hash_data = {
-			'general': state_data.get('general', {}),
-			'rm_df': state_data.get('rm_df', pd.DataFrame()).to_string() if not state_data.get('rm_df', pd.DataFrame()).empty else '',
-			'fuel_rows': str(state_data.get('fuel_rows', [])),
-			'constraints': state_data.get('constraints', {}),
-			'dust': state_data.get('dust', {}),
-			'mode': mode
-		}
-		return hashlib.md5(str(hash_data).encode()).hexdigest()
+		h = hashlib.blake2b(digest_size=16)
+		h.update(_section_digest(state_data.get('general', {})))
+		h.update(_rm_df_digest(state_data.get('rm_df')))
+		h.update(_section_digest(state_data.get('fuel_rows', [])))
+		h.update(_section_digest(state_data.get('constraints', {})))
+		h.update(_section_digest(state_data.get('dust', {})))
+		h.update(_section_digest(mode))
+		return h.hexdigest()
 	except:
 		return None
 
@@ -799,6 +877,11 @@ with tab_general:
 
 with tab_rm:
 	state["rm_df"] = build_rawmix_tab(state.get("rm_df"))
+	# Rebuild the material index only when the table contents change
+	rm_digest = _rm_df_digest(state["rm_df"])
+	if state.get("rm_df_by_material_digest") != rm_digest or "rm_df_by_material" not in state:
+		state["rm_df_by_material"] = materials_index(state["rm_df"])
+		state["rm_df_by_material_digest"] = rm_digest
 
 with tab_fuel:
 	state["fuel_rows"] = build_fuel_tab(state.get("fuel_rows", []))
@@ -813,8 +896,7 @@ solve_clicked = st.sidebar.button("Calculate", key="solve_button")
 mode = st.sidebar.selectbox("Objective", ["Feasibility", "Cost Minimization"], index=0, key="objective_mode")
 
 # Dust scenario toggle - Simplified approach
-st.sidebar.markdown("---")
-st.sidebar.markdown("**🌪️ Dust Routing**")
+st.sidebar.markdown("---\n\n**🌪️ Dust Routing**")
 
 # Simple radio button selection
 dust_scenario = st.sidebar.radio(
@@ -868,97 +950,61 @@ else:
 	st.sidebar.info("⏸️ Manual mode")
 
 # Summary Results Section
-st.sidebar.markdown("---")
-st.sidebar.markdown("**📈 Summary Results**")
+st.sidebar.markdown("---\n\n**📈 Summary Results**")
 
 if hasattr(st.session_state, 'results_cache') and st.session_state.results_cache and st.session_state.results_cache.get("status") == 1:
 	results = st.session_state.results_cache
 	sol = results.get("solution", {})
 	
 	try:
-		# Calculate stage compositions for moduli display
-		from core.compute import calculate_all_stages, calculate_quality_moduli
-		
 		if sol and state.get("rm_dict"):
 			g = state.get("general", {})
-			dust = state.get("dust", {})
-			ash_comp = results.get("ash_comp", {})
-			RM = state.get("rm_dict", {})
-			
-			# Calculate all stages
-			stages = calculate_all_stages(
-				RM=RM,
-				x_percent=sol,
-				dust=dust,
-				pSilo=g.get("pSilo", 10.0) / 100.0,
-				pKiln=g.get("pKiln", 0.0) / 100.0,
-				tonKF=g.get("tonKF", 533.0),
-				clinker_tph=g.get("clinker_tph", 342.0),
-				dust_ratio=g.get("dust_ratio", 3.0) / 100.0,
-				ASH=ash_comp,
-				FCaO_cl=g.get("fcao", 1.0)
-			)
-			
-			# Calculate moduli for each stage
-			rm_moduli = calculate_quality_moduli(stages["raw_meal"])
-			kf_moduli = calculate_quality_moduli(stages["kiln_feed"])
-			cl_moduli = calculate_quality_moduli(stages["clinker"])
-			
-			# Display moduli in compact format
-			st.sidebar.markdown("**Raw Meal:**")
-			st.sidebar.caption(f"LSF: {rm_moduli['LSF']:.1f} | SM: {rm_moduli['SM']:.2f} | AM: {rm_moduli['AM']:.2f}")
 			
-			st.sidebar.markdown("**Kiln Feed:**")
-			st.sidebar.caption(f"LSF: {kf_moduli['LSF']:.1f} | SM: {kf_moduli['SM']:.2f} | AM: {kf_moduli['AM']:.2f}")
-			
-			st.sidebar.markdown("**Clinker:**")
-			st.sidebar.caption(f"LSF: {cl_moduli['LSF']:.1f} | SM: {cl_moduli['SM']:.2f} | AM: {cl_moduli['AM']:.2f}")
+			# Stage values follow the current inputs, matching the results tab and reports
+			results = _attach_stage_results(results, state)
+			rm_moduli = results["rm_moduli"]
+			kf_moduli = results["kf_moduli"]
+			cl_moduli = results["cl_moduli"]
 			
 			# Calculate total cost
-			rm_df = state.get('rm_df')
+			rm_lookup = _state_materials_index(state)
 			tonKF = g.get('tonKF', 533.0)
-			total_cost = 0
-			if rm_df is not None and not rm_df.empty:
-				for material, percentage in sol.items():
-					if percentage is not None:
-						tph = (percentage/100) * tonKF
-						# Find HPP from DataFrame
-						for _, row in rm_df.iterrows():
-							if str(row.get('Material', '')).strip() == material:
-								hpp = float(row.get('HPP', 0) or 0)
-								total_cost += tph * hpp
-								break
-			
-			st.sidebar.markdown("**Economics:**")
-			st.sidebar.caption(f"Total Cost: Rp {total_cost:,.0f}/hour")
+			total_cost = tonKF / 100 * sum(pct * rm_lookup.get(m, (0.0, 0.0))[0] for m, pct in sol.items() if pct)
 			
 			# Dust and fuel metrics
-			dust_tph = g.get('dust_ratio', 3.0) / 100.0 * g.get('clinker_tph', 342.0)
+			dust_tph = results["dust_tph"]
 			total_fuel_tph = results.get('total_fuel_tph', 0)
 			alternative_fuel_heat_pct = results.get('alternative_fuel_heat_pct', 0)
 			
-			st.sidebar.markdown("**Operations:**")
-			st.sidebar.caption(f"Dust Loss: {dust_tph:.1f} TPH")
-			st.sidebar.caption(f"Total Fuel: {total_fuel_tph:.1f} TPH")
-			st.sidebar.caption(f"Alt. Fuel Heat: {alternative_fuel_heat_pct:.1f}%")
+			# Display moduli, economics and operations as one compact block
+			st.sidebar.markdown(
+				"**Raw Meal:**  \n"
+				f"<small>LSF: {rm_moduli['LSF']:.1f} | SM: {rm_moduli['SM']:.2f} | AM: {rm_moduli['AM']:.2f}</small>\n\n"
+				"**Kiln Feed:**  \n"
+				f"<small>LSF: {kf_moduli['LSF']:.1f} | SM: {kf_moduli['SM']:.2f} | AM: {kf_moduli['AM']:.2f}</small>\n\n"
+				"**Clinker:**  \n"
+				f"<small>LSF: {cl_moduli['LSF']:.1f} | SM: {cl_moduli['SM']:.2f} | AM: {cl_moduli['AM']:.2f}</small>\n\n"
+				"**Economics:**  \n"
+				f"<small>Total Cost: Rp {total_cost:,.0f}/hour</small>\n\n"
+				"**Operations:**  \n"
+				f"<small>Dust Loss: {dust_tph:.1f} TPH<br>Total Fuel: {total_fuel_tph:.1f} TPH<br>Alt. Fuel Heat: {alternative_fuel_heat_pct:.1f}%</small>",
+				unsafe_allow_html=True
+			)
 			
 	except Exception as e:
 		st.sidebar.error(f"Summary calc error: {str(e)[:30]}...")
 else:
 	st.sidebar.info("📊 Run calculation to see summary")
 
-# Export Section
-st.sidebar.markdown("---")
-st.sidebar.markdown("📋 **Export Report**")
-
-if hasattr(st.session_state, 'results_cache') and st.session_state.results_cache and st.session_state.results_cache.get("status") == 1:
-	# Export buttons
-	col1, col2 = st.sidebar.columns(2)
+@st.fragment
+def _export_buttons(state, results):
+	"""Report export buttons; a click reruns only this fragment, not the solve"""
+	col1, col2 = st.columns(2)
 	
 	with col1:
 		if st.button("📄 Excel", key="export_excel", help="Export detailed report to Excel format", use_container_width=True):
 			try:
-				excel_data = create_excel_report(state, st.session_state.results_cache)
+				excel_data = _report_future("xlsx", state, results).result()
 				if excel_data:
 					timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 					filename = f"RawMix_Report_{timestamp}.xlsx"
@@ -971,12 +1017,14 @@ if hasattr(st.session_state, 'results_cache') and st.session_state.results_cache
 					)
 					st.success("✅ Excel report ready!")
 			except Exception as e:
+				# Drop the failed futures so the next click builds again
+				st.session_state.pop("report_futures", None)
 				st.error(f"❌ Excel export failed: {str(e)}")
 	
 	with col2:
 		if st.button("📜 PDF", key="export_pdf", help="Export summary report to PDF format", use_container_width=True):
 			try:
-				pdf_data = create_pdf_report(state, st.session_state.results_cache)
+				pdf_data = _report_future("pdf", state, results).result()
 				if pdf_data:
 					timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 					filename = f"RawMix_Report_{timestamp}.pdf"
@@ -989,8 +1037,15 @@ if hasattr(st.session_state, 'results_cache') and st.session_state.results_cache
 					)
 					st.success("✅ PDF report ready!")
 			except Exception as e:
+				st.session_state.pop("report_futures", None)
 				st.error(f"❌ PDF export failed: {str(e)}")
 
+# Export Section
+st.sidebar.markdown("---\n\n📋 **Export Report**")
+
+if hasattr(st.session_state, 'results_cache') and st.session_state.results_cache and st.session_state.results_cache.get("status") == 1:
+	with st.sidebar:
+		_export_buttons(state, st.session_state.results_cache)
 else:
 	st.sidebar.info("📋 Export available after successful calculation")
 
@@ -1008,9 +1063,7 @@ def try_solve():
 			st.warning("⚠️ At least 2 raw materials required for optimization.")
 			return None
 
-		RM = to_rm_dict(rm_df)
-		costs = to_costs_dict(rm_df)
-		bounds = to_bounds_dict(rm_df)
+		RM, bounds, costs = rm_df_to_dicts(rm_df)
 		
 		if not RM:
 			st.error("❌ No valid raw materials found. Check material names and compositions.")
@@ -1057,32 +1110,29 @@ def try_solve():
 		if total_fuel_prop <= 0:
 			st.warning("⚠️ No fuel proportions set. Using default fuel mix.")
 			# Use default if no fuels specified
-			fuels = [
-				{"Fuel":"Fine Coal","prop":75.3,"cv":4800,"ash":14.0,"S":0.3,"SiO2":11.87,"Al2O3":9.03,"Fe2O3":51.37,"CaO":4.0,"K2O":0.20,"Na2O":0.30,"LOI":0.0},
-				{"Fuel":"Sekam","prop":19.5,"cv":2500,"ash":25.0,"S":0.3,"SiO2":95.0,"Al2O3":0.17,"Fe2O3":0.35,"CaO":0.91,"K2O":0.11,"Na2O":0.43,"LOI":0.0},
-				{"Fuel":"SBE","prop":1.2,"cv":1800,"ash":65.0,"S":0.5,"SiO2":64.0,"Al2O3":16.0,"Fe2O3":1.2,"CaO":1.2,"K2O":1.54,"Na2O":2.25,"LOI":0.0},
-				{"Fuel":"Tankos","prop":4.0,"cv":3000,"ash":11.0,"S":0.2,"SiO2":40.0,"Al2O3":10.0,"Fe2O3":2.0,"CaO":10.0,"K2O":0.11,"Na2O":30.0,"LOI":0.0},
-			]
+			fuels = [dict(fuel) for fuel in DEFAULT_FUELS]
 		else:
 			# Normalize fuel proportions to 100%
 			for f in fuels:
 				f["prop"] = (f.get("prop", 0) / total_fuel_prop) * 100
 
-		cv_total = compute_cv_total(fuels)
+		# Column arrays built once and shared by the fuel reductions below
+		fuel_arr = fuel_arrays(fuels)
+		cv_total = compute_cv_total(fuel_arr)
 		if cv_total <= 0:
 			st.error("❌ Total calorific value must be greater than 0.")
 			return None
 
 		total_fuel_tph = compute_total_fuel_tph(g.get("stec", 800.0), g.get("clinker_tph", 342.0), cv_total)
-		total_ash_tph = compute_total_ash_tph(fuels, total_fuel_tph)
-		ash_comp = compute_ash_composition(fuels)
+		total_ash_tph = compute_total_ash_tph(fuel_arr, total_fuel_tph)
+		ash_comp = compute_ash_composition(fuel_arr)
 		
 		# Add total ash TPH to ash composition for use in calculations
 		if ash_comp:
 			ash_comp['total_ash_tph'] = total_ash_tph
 
 		# Solve
-		status, sol, meta = solve_rawmix(
+		solve_args = dict(
 			RM=RM,
 			DUST=dust,
 			ASH=ash_comp,
@@ -1103,6 +1153,10 @@ def try_solve():
 			epsilon=0.001 if mode == "Feasibility" else 0.0,
 			objective_mode=("cost" if mode == "Cost Minimization" else "feasibility"),
 		)
+		
+		# solve_rawmix reuses results for inputs it has already solved
+		prev = st.session_state.get("results_cache") or {}
+		status, sol, meta = solve_rawmix(**solve_args, warm_start=prev.get("solution"))
 
 		# Store RM dict for composition calculations
 		state["rm_dict"] = RM
@@ -1123,9 +1177,9 @@ def try_solve():
 			return {"status": status, "solution": {}, "meta": {}}
 
 		# Calculate alternative fuel heat percentage
-		alternative_fuel_heat_pct = compute_alternative_fuel_heat_percentage(fuels)
+		alternative_fuel_heat_pct = compute_alternative_fuel_heat_percentage(fuel_arr)
 
-		return {
+		results = {
 			"status": status,
 			"solution": sol,
 			"meta": meta,
@@ -1135,6 +1189,7 @@ def try_solve():
 			"ash_comp": ash_comp,
 			"alternative_fuel_heat_pct": alternative_fuel_heat_pct,
 		}
+		return results
 	
 	except Exception as e:
 		st.error(f"❌ An error occurred during optimization: {str(e)}")
@@ -1171,8 +1226,14 @@ else:
 		# Cache the results
 		if results:
 			st.session_state.results_cache = results
+		
+		# A manual recalculation drops this session's pending reports
+		if solve_clicked:
+			st.session_state.pop("report_futures", None)
 
 with tab_results:
+	if results and results.get("status") == 1:
+		results = _attach_stage_results(results, state)
 	render_results_tab(state, results)
 
 with tab_history:
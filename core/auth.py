@@ -4,17 +4,27 @@ Supports both Clerk integration and local authentication
 """
 
 import streamlit as st
-import requests
-import jwt
 import bcrypt
-import json
+import orjson
 import os
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import hashlib
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-from jwt import PyJWKClient
+from dotenv import load_dotenv
+from collections import OrderedDict
+import threading
+import time
+
+# Decoded Clerk claims keyed by token digest; module-level so it outlives reruns
+_TOKEN_CACHE: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_TOKEN_CACHE_SIZE = 256
+# Streamlit serves sessions on separate threads, so every cache access takes this lock
+_TOKEN_CACHE_LOCK = threading.Lock()
+# Serializes read-modify-write of the login sidecar across session threads
+_LOGIN_FILE_LOCK = threading.Lock()
+
+# Load environment variables once at import rather than per AuthManager
+load_dotenv()
 
 
 class AuthenticationError(Exception):
@@ -26,6 +36,8 @@ class ClerkAuth:
     """Clerk authentication integration"""
     
     def __init__(self, publishable_key: str, jwks_url: str = None, issuer: str = None):
+        # PyJWT/cryptography are only needed when Clerk is configured
+        from jwt import PyJWKClient
         self.publishable_key = publishable_key
         self.jwks_url = jwks_url or f"https://{publishable_key.split('_')[2]}.clerk.accounts.dev/.well-known/jwks.json"
         self.issuer = issuer or f"https://{publishable_key.split('_')[2]}.clerk.accounts.dev"
@@ -33,6 +45,17 @@ class ClerkAuth:
         
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify Clerk JWT token using JWKS"""
+        import jwt
+        
+        token_hash = hashlib.sha256(token.encode('utf-8')).digest()
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(token_hash)
+            if cached is not None:
+                if cached.get('exp', 0) > time.time():
+                    _TOKEN_CACHE.move_to_end(token_hash)
+                    return cached
+                _TOKEN_CACHE.pop(token_hash, None)
+        
         try:
             # Get the signing key from JWKS
             if self.jwks_client:
@@ -56,6 +79,11 @@ class ClerkAuth:
                 }
             )
             
+            if 'exp' in decoded:
+                with _TOKEN_CACHE_LOCK:
+                    _TOKEN_CACHE[token_hash] = decoded
+                    if len(_TOKEN_CACHE) > _TOKEN_CACHE_SIZE:
+                        _TOKEN_CACHE.popitem(last=False)
             return decoded
             
         except jwt.ExpiredSignatureError:
@@ -101,6 +129,12 @@ class LocalAuth:
     
     def __init__(self, users_file: str = "data/users.json"):
         self.users_file = users_file
+        # Login timestamps live in a small keyed sidecar so users.json stays untouched on login
+        self.login_file = os.path.join(os.path.dirname(users_file), "last_login.json")
+        # bcrypt cost factor; each extra round doubles hashing time
+        self.rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+        # Registered emails, valid while users.json keeps the same mtime/size
+        self._emails = None
         self._ensure_users_file()
     
     def _ensure_users_file(self):
@@ -108,25 +142,65 @@ class LocalAuth:
         if not os.path.exists(self.users_file):
             os.makedirs(os.path.dirname(self.users_file), exist_ok=True)
             default_users = {}
-            with open(self.users_file, 'w') as f:
-                json.dump(default_users, f)
+            with open(self.users_file, 'wb') as f:
+                f.write(orjson.dumps(default_users))
+    
+    def _users_stamp(self):
+        stat = os.stat(self.users_file)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _email_index(self, users: Dict[str, Any]) -> set:
+        """Set of registered emails, rebuilt only when users.json changes"""
+        stamp = self._users_stamp()
+        if self._emails is None or self._emails[0] != stamp:
+            self._emails = (stamp, {u.get('email') for u in users.values()})
+        return self._emails[1]
+    
+    def _load_logins(self) -> Dict[str, str]:
+        """Login timestamps keyed by username"""
+        try:
+            with open(self.login_file, 'rb') as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+    
+    def _record_login(self, username: str) -> str:
+        """Store the login timestamp in the sidecar file"""
+        timestamp = datetime.now().isoformat()
+        with _LOGIN_FILE_LOCK:
+            logins = self._load_logins()
+            logins[username] = timestamp
+            # Write a temp file and swap it in, so readers never see a partial file
+            tmp_file = f"{self.login_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(logins))
+            os.replace(tmp_file, self.login_file)
+        return timestamp
     
     def hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.rounds)
         return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
     
     def verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash"""
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
     
+    def needs_rehash(self, hashed: str) -> bool:
+        """Check if a stored hash uses a lower cost than configured"""
+        try:
+            return int(hashed.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+    
     def create_user(self, username: str, email: str, password: str, full_name: str = "") -> bool:
         """Create a new user"""
         try:
-            with open(self.users_file, 'r') as f:
-                users = json.load(f)
+            with open(self.users_file, 'rb') as f:
+                users = orjson.loads(f.read())
             
-            if username in users or any(u.get('email') == email for u in users.values()):
+            emails = self._email_index(users)
+            if username in users or email in emails:
                 return False  # User already exists
             
             users[username] = {
@@ -137,8 +211,10 @@ class LocalAuth:
                 "last_login": None
             }
             
-            with open(self.users_file, 'w') as f:
-                json.dump(users, f, indent=2)
+            with open(self.users_file, 'wb') as f:
+                f.write(orjson.dumps(users, option=orjson.OPT_INDENT_2))
+            emails.add(email)
+            self._emails = (self._users_stamp(), emails)
             
             return True
         except Exception:
@@ -147,8 +223,8 @@ class LocalAuth:
     def authenticate_user(self, username: str, password: str) -> Dict[str, Any]:
         """Authenticate user with username/password"""
         try:
-            with open(self.users_file, 'r') as f:
-                users = json.load(f)
+            with open(self.users_file, 'rb') as f:
+                users = orjson.loads(f.read())
             
             if username not in users:
                 raise AuthenticationError("Invalid username or password")
@@ -157,22 +233,23 @@ class LocalAuth:
             if not self.verify_password(password, user['password_hash']):
                 raise AuthenticationError("Invalid username or password")
             
-            # Update last login
-            user['last_login'] = datetime.now().isoformat()
-            users[username] = user
-            
-            with open(self.users_file, 'w') as f:
-                json.dump(users, f, indent=2)
+            # Upgrade hashes weaker than the configured cost; never lower a stronger one
+            if self.needs_rehash(user['password_hash']):
+                user['password_hash'] = self.hash_password(password)
+                with open(self.users_file, 'wb') as f:
+                    f.write(orjson.dumps(users, option=orjson.OPT_INDENT_2))
             
             # Return user info (without password hash)
             user_info = user.copy()
             del user_info['password_hash']
             user_info['username'] = username
+            # users.json no longer carries login times; they come from the sidecar
+            user_info['last_login'] = self._record_login(username)
             return user_info
             
         except FileNotFoundError:
             raise AuthenticationError("Authentication system not initialized")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             raise AuthenticationError("Authentication data corrupted")
 
 
@@ -183,10 +260,6 @@ class AuthManager:
         self.clerk_auth = None
         self.local_auth = LocalAuth()
         
-        # Load environment variables
-        from dotenv import load_dotenv
-        load_dotenv()
-        
         # Initialize Clerk if credentials are available
         clerk_publishable = os.getenv('CLERK_PUBLISHABLE_KEY')
         clerk_jwks_url = os.getenv('CLERK_JWKS_URL')
@@ -1,39 +1,47 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 
+import numpy as np
 
-def compute_alternative_fuel_heat_percentage(fuels: List[Dict]) -> float:
+FUEL_FIELDS = ["prop", "cv", "ash", "SiO2", "Al2O3", "Fe2O3", "CaO", "K2O", "Na2O", "LOI"]
+
+
+def _is_fine_coal(name) -> bool:
+	name = str(name).strip().lower()
+	return "fine coal" in name or "finecoal" in name.replace(" ", "")
+
+
+def fuel_arrays(fuels: List[Dict]) -> Dict[str, np.ndarray]:
+	"""Column arrays of the numeric fuel fields, missing values as 0, plus a Fine Coal mask."""
+	n = len(fuels)
+	arr = {k: np.fromiter(((f.get(k, 0.0) or 0.0) for f in fuels), dtype=np.float64, count=n) for k in FUEL_FIELDS}
+	arr["fine_coal"] = np.fromiter((_is_fine_coal(f.get("Fuel", "")) for f in fuels), dtype=bool, count=n)
+	return arr
+
+
+def _as_fuel_arrays(fuels: Union[List[Dict], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+	return fuels if isinstance(fuels, dict) else fuel_arrays(fuels)
+
+
+def compute_alternative_fuel_heat_percentage(fuels: Union[List[Dict], Dict[str, np.ndarray]]) -> float:
 	"""Calculate the proportional heat % from alternative fuels (100 - Fine Coal %).
 	Based on calorific value contribution, not just mass proportion.
 	"""
-	total_heat = 0.0
-	fine_coal_heat = 0.0
-	
-	for fuel in fuels:
-		fuel_name = str(fuel.get("Fuel", "")).strip().lower()
-		prop = fuel.get("prop", 0.0) or 0.0
-		cv = fuel.get("cv", 0.0) or 0.0
-		heat_contribution = prop * cv
-		
-		total_heat += heat_contribution
-		
-		# Check if this is Fine Coal (case insensitive)
-		if "fine coal" in fuel_name or "finecoal" in fuel_name.replace(" ", ""):
-			fine_coal_heat += heat_contribution
-	
+	arr = _as_fuel_arrays(fuels)
+	heat = arr["prop"] * arr["cv"]
+	total_heat = float(heat.sum())
 	if total_heat == 0:
 		return 0.0
 	
 	# Alternative fuel heat % = 100 - Fine Coal heat %
-	fine_coal_percentage = (fine_coal_heat / total_heat) * 100
-	alternative_fuel_percentage = 100 - fine_coal_percentage
-	
-	return alternative_fuel_percentage
+	fine_coal_percentage = (float(heat[arr["fine_coal"]].sum()) / total_heat) * 100
+	return 100 - fine_coal_percentage
 
 
-def compute_cv_total(fuels: List[Dict]) -> float:
-	num = sum((f.get("prop", 0.0) or 0.0) * (f.get("cv", 0.0) or 0.0) for f in fuels)
-	den = sum((f.get("prop", 0.0) or 0.0) for f in fuels) or 1.0
-	return num / (den or 1.0)
+def compute_cv_total(fuels: Union[List[Dict], Dict[str, np.ndarray]]) -> float:
+	arr = _as_fuel_arrays(fuels)
+	num = float(arr["prop"] @ arr["cv"])
+	den = float(arr["prop"].sum()) or 1.0
+	return num / den
 
 
 def compute_total_fuel_tph(stec: float, clinker_tph: float, cv_total: float) -> float:
@@ -41,21 +49,20 @@ def compute_total_fuel_tph(stec: float, clinker_tph: float, cv_total: float) ->
 	return (stec * clinker_tph) / cv
 
 
-def compute_total_ash_tph(fuels: List[Dict], total_fuel_tph: float) -> float:
-	return sum(((f.get("ash", 0.0) or 0.0) / 100.0) * ((f.get("prop", 0.0) or 0.0) / 100.0) * total_fuel_tph for f in fuels)
+def compute_total_ash_tph(fuels: Union[List[Dict], Dict[str, np.ndarray]], total_fuel_tph: float) -> float:
+	arr = _as_fuel_arrays(fuels)
+	return float((arr["ash"] / 100.0) @ (arr["prop"] / 100.0)) * total_fuel_tph
 
 
-def compute_ash_composition(fuels: List[Dict]) -> Dict[str, float]:
+def compute_ash_composition(fuels: Union[List[Dict], Dict[str, np.ndarray]]) -> Dict[str, float]:
 	"""Weighted by (prop% * ash%). Unknown oxides default to 0.
 	Expected per fuel oxide keys: SiO2, Al2O3, Fe2O3, CaO, K2O, Na2O, LOI
 	"""
 	ox_keys = ["SiO2", "Al2O3", "Fe2O3", "CaO", "K2O", "Na2O", "LOI"]
-	weights = [((f.get("ash", 0.0) or 0.0) / 100.0) * ((f.get("prop", 0.0) or 0.0) / 100.0) for f in fuels]
-	total_w = sum(weights) or 1.0
-	res = {}
-	for ox in ox_keys:
-		res[ox] = sum((weights[i] / total_w) * (fuels[i].get(ox, 0.0) or 0.0) for i in range(len(fuels)))
-	return res
+	arr = _as_fuel_arrays(fuels)
+	weights = (arr["ash"] / 100.0) * (arr["prop"] / 100.0)
+	weights = weights / (float(weights.sum()) or 1.0)
+	return {ox: float(weights @ arr[ox]) for ox in ox_keys}
 
 
 def calculate_all_stages(RM: Dict[str, Dict[str, float]], x_percent: Dict[str, float], 
@@ -64,46 +71,51 @@ def calculate_all_stages(RM: Dict[str, Dict[str, float]], x_percent: Dict[str, f
                         ASH: Dict[str, float], FCaO_cl: float = 1.0):
 	"""Calculate compositions for all stages: Raw Meal → Kiln Feed → Unignited → Clinker"""
 	
-	# Raw Meal composition
-	def ox_rm(ox: str) -> float:
-		return sum((x_percent.get(k, 0.0) or 0.0) * (RM[k].get(ox, 0.0) or 0.0) for k in x_percent) / 100.0
-	
+	# Raw Meal composition; resolve each material's proportion and row once
+	mix = [(x_percent.get(k, 0.0) or 0.0, RM[k]) for k in x_percent]
 	rm = {}
 	for ox in ["SiO2", "Al2O3", "Fe2O3", "CaO", "K2O", "Na2O", "LOI"]:
-		rm[ox] = ox_rm(ox)
+		rm[ox] = sum(x * (comp.get(ox, 0.0) or 0.0) for x, comp in mix) / 100.0
+	
+	# Dust oxides are read by both the kiln feed and unignited steps
+	dust_ox = [(ox, dust.get(ox, 0.0) or 0.0) for ox in rm]
 	
 	# Kiln Feed composition
 	if pSilo > 0:
 		# Dust → Silo scenario
 		kf = {}
-		for ox in rm:
-			kf[ox] = (1 - pSilo) * rm[ox] + pSilo * (dust.get(ox, 0.0) or 0.0)
+		for ox, d in dust_ox:
+			kf[ox] = (1 - pSilo) * rm[ox] + pSilo * d
+	elif pKiln == 0:
+		# No dust returned anywhere: kiln feed equals raw meal
+		kf = dict(rm)
 	else:
 		# Dust → Kiln scenario
 		den = 1 + pKiln
 		kf = {}
-		for ox in rm:
-			kf[ox] = (rm[ox] + pKiln * (dust.get(ox, 0.0) or 0.0)) / den
+		for ox, d in dust_ox:
+			kf[ox] = (rm[ox] + pKiln * d) / den
 	
 	# Unignited composition
 	tonDustLoss = dust_ratio * clinker_tph
 	totalAshTPH = ASH.get('total_ash_tph', 0.0) if ASH else 0.0  # Get from ASH dict or calculate
 	D = tonKF - tonDustLoss + totalAshTPH
 	
+	D_div = D if D != 0 else 1.0
+	has_ash = bool(ASH) and totalAshTPH != 0
 	u = {}
-	for ox in rm:
+	for ox, d in dust_ox:
+		u[ox] = (kf[ox] * tonKF) - (d * tonDustLoss)
 		# Include ash contribution in unignited calculation
-		ash_contrib = (ASH.get(ox, 0.0) or 0.0) * totalAshTPH if ASH else 0.0
-		u[ox] = ((kf[ox] * tonKF) - ((dust.get(ox, 0.0) or 0.0) * tonDustLoss) + ash_contrib) / (D if D != 0 else 1.0)
+		if has_ash:
+			u[ox] += (ASH.get(ox, 0.0) or 0.0) * totalAshTPH
+		u[ox] /= D_div
 	
 	# Clinker composition (LOI-free)
 	Z = 100 - u["LOI"]
-	cl = {}
-	for ox in rm:
-		if ox == "LOI":
-			cl[ox] = 0.0
-		else:
-			cl[ox] = (u[ox] / (Z if Z != 0 else 1.0)) * 100.0
+	Z_div = Z if Z != 0 else 1.0
+	cl = {ox: (u[ox] / Z_div) * 100.0 for ox in rm}
+	cl["LOI"] = 0.0
 	
 	# Add Free Lime to clinker
 	cl["FCaO"] = FCaO_cl
@@ -119,11 +131,14 @@ def calculate_all_stages(RM: Dict[str, Dict[str, float]], x_percent: Dict[str, f
 
 
 def compute_bogue(cl: Dict[str, float]) -> Dict[str, float]:
+	SiO2 = cl.get("SiO2", 0.0) or 0.0
+	Al2O3 = cl.get("Al2O3", 0.0) or 0.0
+	Fe2O3 = cl.get("Fe2O3", 0.0) or 0.0
 	CaO_eff = (cl.get("CaO", 0.0) or 0.0) - (cl.get("FCaO", 0.0) or 0.0)
-	C3S = 4.07 * CaO_eff - 7.60 * (cl.get("SiO2", 0.0) or 0.0) - 6.72 * (cl.get("Al2O3", 0.0) or 0.0) - 1.43 * (cl.get("Fe2O3", 0.0) or 0.0)
-	C4AF = 3.04 * (cl.get("Fe2O3", 0.0) or 0.0)
-	C3A = 2.65 * (cl.get("Al2O3", 0.0) or 0.0) - 1.69 * (cl.get("Fe2O3", 0.0) or 0.0)
-	C2S = 2.87 * (cl.get("SiO2", 0.0) or 0.0) - 0.7544 * C3S
+	C3S = 4.07 * CaO_eff - 7.60 * SiO2 - 6.72 * Al2O3 - 1.43 * Fe2O3
+	C4AF = 3.04 * Fe2O3
+	C3A = 2.65 * Al2O3 - 1.69 * Fe2O3
+	C2S = 2.87 * SiO2 - 0.7544 * C3S
 	return {"C3S": C3S, "C2S": C2S, "C3A": C3A, "C4AF": C4AF}
 
 
@@ -141,7 +156,8 @@ def calculate_quality_moduli(composition: Dict[str, float]) -> Dict[str, float]:
 	LSF = (CaO / denom * 100) if denom != 0 else 0.0
 	
 	# SM
-	SM = SiO2 / (Al2O3 + Fe2O3) if (Al2O3 + Fe2O3) != 0 else 0.0
+	AF = Al2O3 + Fe2O3
+	SM = SiO2 / AF if AF != 0 else 0.0
 	
 	# AM
 	AM = Al2O3 / Fe2O3 if Fe2O3 != 0 else 0.0
@@ -155,3 +171,20 @@ def calculate_quality_moduli(composition: Dict[str, float]) -> Dict[str, float]:
 		"AM": AM,
 		"NaEq": NaEq
 	}
+
+
+def _safe_ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+	return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+
+def calculate_quality_moduli_batch(compositions: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+	"""Vectorized calculate_quality_moduli over aligned oxide columns"""
+	SiO2, Al2O3, Fe2O3, CaO, K2O, Na2O = (
+		np.asarray(compositions[ox], dtype=np.float64) for ox in ("SiO2", "Al2O3", "Fe2O3", "CaO", "K2O", "Na2O")
+	)
+	return {
+		"LSF": _safe_ratio(CaO, 2.8 * SiO2 + 1.18 * Al2O3 + 0.65 * Fe2O3) * 100,
+		"SM": _safe_ratio(SiO2, Al2O3 + Fe2O3),
+		"AM": _safe_ratio(Al2O3, Fe2O3),
+		"NaEq": Na2O + 0.658 * K2O,
+	}
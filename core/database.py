@@ -1,22 +1,137 @@
 import sqlite3
 import json
+import zlib
+import orjson
+import copy
+import functools
+import operator
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-import uuid
-from typing import Dict, List, Optional, Tuple
+import secrets
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Version byte leading each compressed results_history payload
+_PACKED_V1 = b"\x01"
+
+
+def _pack_json(value) -> bytes:
+    """orjson + zlib level 1, prefixed with the payload version"""
+    return _PACKED_V1 + zlib.compress(orjson.dumps(value), 1)
+
+
+def _unpack_json(value):
+    """Decode a packed payload, or a plain JSON TEXT value from older rows"""
+    if not value:
+        return {}
+    if isinstance(value, bytes) and value[:1] == _PACKED_V1:
+        return orjson.loads(zlib.decompress(value[1:]))
+    return orjson.loads(value)
+
+
+# Column defaults for the save paths, in table column order
+_GENERAL_DEFAULTS = {
+    "stec": 800.0, "clinker_tph": 342.0, "tonKF": 533.0, "dust_ratio": 5.0,
+    "fcao": 1.2, "pSilo": 10.0, "pKiln": 5.0, "h2o_rawmeal": 0.50,
+}
+_CONSTRAINTS_DEFAULTS = {
+    "LSF_min": 95.5, "LSF_max": 96.5, "SM_min": 2.28, "SM_max": 2.32,
+    "AM_min": 1.55, "AM_max": 1.60, "NaEq_max": 0.60, "C3S_min": 58.0, "C3S_max": 65.0,
+}
+_DUST_DEFAULTS = {
+    "H2O": 0.5, "LOI": 40.0, "SiO2": 10.6, "Al2O3": 3.76, "Fe2O3": 2.23, "CaO": 45.90,
+    "MgO": 0.54, "K2O": 0.12, "Na2O": 0.39, "SO3": 0.02, "Cl": 0.02,
+}
+_FUEL_DEFAULTS = {
+    "Fuel": "New Fuel", "prop": 0.0, "cv": 4000.0, "ash": 15.0, "S": 0.3, "SiO2": 50.0,
+    "Al2O3": 25.0, "Fe2O3": 15.0, "CaO": 5.0, "K2O": 2.0, "Na2O": 1.0, "LOI": 0.0,
+}
+_general_values = operator.itemgetter(*_GENERAL_DEFAULTS)
+_constraints_values = operator.itemgetter(*_CONSTRAINTS_DEFAULTS)
+_dust_values = operator.itemgetter(*_DUST_DEFAULTS)
+_fuel_values = operator.itemgetter(*_FUEL_DEFAULTS)
+
+
+def _new_id() -> str:
+    """Random 64-bit hex row id; cheaper to generate than a formatted uuid4"""
+    return secrets.token_hex(8)
+
+
+def _cached_read(kind: str):
+    """Memoize a per-project getter until a writer invalidates that kind"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, project_id: str):
+            key = (kind, project_id)
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = method(self, project_id)
+                # Callers edit what they get back, so hand out copies
+                return copy.deepcopy(self._cache[key])
+        return wrapper
+    return decorator
+
 
 class RawMixDatabase:
     """Database manager for Raw Mix Design Optimizer"""
     
+    _CACHED_KINDS = ("general_params", "raw_materials", "fuels", "constraints", "dust_composition")
+    # Stored in PRAGMA user_version; bump whenever init_database changes the schema
+    SCHEMA_VERSION = 1
+    
     def __init__(self, db_path: str = "data/rawmix.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
+        # One connection per process keeps SQLite's page cache warm across reruns;
+        # Streamlit sessions run on different threads, so access is serialized
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-64000")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._cache: Dict[tuple, object] = {}
         self.init_database()
     
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Shared connection; the outermost block commits, or rolls back on error"""
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self._conn
+                if self._depth == 1:
+                    self._conn.commit()
+            except Exception:
+                if self._depth == 1:
+                    self._conn.rollback()
+                    # Reads inside the failed transaction may have cached uncommitted rows
+                    self._cache.clear()
+                raise
+            finally:
+                self._depth -= 1
+    
+    def transaction(self):
+        """Group several calls into one transaction on the shared connection"""
+        return self._connect()
+    
+    def _invalidate(self, project_id: str, *kinds: str):
+        """Drop cached reads of the given kinds for a project"""
+        with self._lock:
+            for kind in kinds:
+                self._cache.pop((kind, project_id), None)
+    
     def init_database(self):
-        """Initialize database tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Initialize database tables, unless the file is already at SCHEMA_VERSION"""
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+        
+        with self._connect() as conn:
+            # WAL lets readers proceed during writes; the mode persists in the file
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             
             # Check if this is a migration (existing database)
@@ -171,8 +286,8 @@ class RawMixDatabase:
                 CREATE TABLE IF NOT EXISTS results_history (
                     id TEXT PRIMARY KEY,
                     project_id TEXT NOT NULL,
-                    solution_data TEXT NOT NULL,
-                    meta_data TEXT,
+                    solution_data BLOB NOT NULL,
+                    meta_data BLOB,
                     total_cost REAL,
                     solver_status INTEGER,
                     calculation_time REAL,
@@ -181,27 +296,45 @@ class RawMixDatabase:
                 )
             """)
             
-            conn.commit()
+            # Single-row tables: keep the newest row per project so project_id can be unique
+            for table in ("general_params", "constraints", "dust_composition"):
+                cursor.execute(f"DELETE FROM {table} WHERE rowid NOT IN (SELECT MAX(rowid) FROM {table} GROUP BY project_id)")
+            
+            # Indexes for the per-project lookups and ordered listings; executed one by one
+            # because executescript would commit the dedupe above before the indexes exist
+            for statement in (
+                "CREATE INDEX IF NOT EXISTS idx_projects_user ON projects (user_id, updated_at DESC) WHERE is_active = TRUE",
+                "CREATE INDEX IF NOT EXISTS idx_projects_active ON projects (updated_at DESC) WHERE is_active = TRUE",
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_general_params_project ON general_params (project_id)",
+                "CREATE INDEX IF NOT EXISTS idx_raw_materials_project ON raw_materials (project_id, is_active, created_at)",
+                "CREATE INDEX IF NOT EXISTS idx_fuels_project ON fuels (project_id, is_active, created_at)",
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_constraints_project ON constraints (project_id)",
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_dust_composition_project ON dust_composition (project_id)",
+                "CREATE INDEX IF NOT EXISTS idx_results_history_project ON results_history (project_id, created_at DESC)",
+            ):
+                cursor.execute(statement)
+            
+            cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
     
     # Project Management Methods
     def create_project(self, name: str, description: str = "", user_id: str = None) -> str:
         """Create a new project and return its ID"""
-        project_id = str(uuid.uuid4())
+        project_id = _new_id()
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO projects (id, name, description, user_id)
                 VALUES (?, ?, ?, ?)
             """, (project_id, name, description, user_id))
-            conn.commit()
-        
-        # Initialize with default values
-        self._initialize_project_defaults(project_id)
+            self._invalidate_projects()
+            
+            # Initialize with default values in the same transaction
+            self._initialize_project_defaults(project_id)
         return project_id
     
     def _initialize_project_defaults(self, project_id: str):
-        """Initialize project with default values from defaults.json"""
+        """Initialize project with default values from defaults.json, in one transaction"""
         # Load current defaults
         defaults_path = Path("data/defaults.json")
         if defaults_path.exists():
@@ -209,32 +342,38 @@ class RawMixDatabase:
         else:
             defaults = {}
         
-        # Initialize general parameters
-        general = defaults.get("general", {})
-        self.save_general_params(project_id, general)
-        
-        # Initialize raw materials
-        raw_mix_data = defaults.get("raw_mix_rows", [])
-        if raw_mix_data:
-            for row in raw_mix_data:
-                self.add_raw_material(project_id, *row)
-        
-        # Initialize fuels
-        fuel_data = defaults.get("fuel_rows", [])
-        for fuel in fuel_data:
-            self.add_fuel(project_id, fuel)
-        
-        # Initialize constraints
-        constraints = defaults.get("constraints", {})
-        self.save_constraints(project_id, constraints)
-        
-        # Initialize dust composition
-        dust = defaults.get("dust", {})
-        self.save_dust_composition(project_id, dust)
+        with self._connect():
+            # Initialize general parameters
+            general = defaults.get("general", {})
+            self.save_general_params(project_id, general)
+            
+            # Initialize raw materials
+            raw_mix_data = defaults.get("raw_mix_rows", [])
+            if raw_mix_data:
+                self.add_raw_materials_bulk(project_id, raw_mix_data)
+            
+            # Initialize fuels
+            fuel_data = defaults.get("fuel_rows", [])
+            self.add_fuels_bulk(project_id, fuel_data)
+            
+            # Initialize constraints
+            constraints = defaults.get("constraints", {})
+            self.save_constraints(project_id, constraints)
+            
+            # Initialize dust composition
+            dust = defaults.get("dust", {})
+            self.save_dust_composition(project_id, dust)
     
     def get_projects(self, user_id: str = None) -> List[Dict]:
         """Get all active projects, optionally filtered by user_id"""
-        with sqlite3.connect(self.db_path) as conn:
+        key = ("projects", user_id)
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = self._query_projects(user_id)
+            return copy.deepcopy(self._cache[key])
+    
+    def _query_projects(self, user_id: Optional[str]) -> List[Dict]:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             if user_id:
@@ -256,47 +395,46 @@ class RawMixDatabase:
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
+    def _invalidate_projects(self):
+        """Drop every cached project listing"""
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == "projects"]:
+                del self._cache[key]
+    
     def delete_project(self, project_id: str):
         """Delete a project (soft delete)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE projects SET is_active = FALSE 
                 WHERE id = ?
             """, (project_id,))
-            conn.commit()
+            self._invalidate_projects()
+            self._invalidate(project_id, *self._CACHED_KINDS)
     
     # General Parameters Methods
     def save_general_params(self, project_id: str, params: Dict):
         """Save general parameters for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
-            # Delete existing params
-            cursor.execute("DELETE FROM general_params WHERE project_id = ?", (project_id,))
-            
-            # Insert new params
+            # One row per project: update it in place when it exists
             cursor.execute("""
                 INSERT INTO general_params (
                     id, project_id, stec, clinker_tph, tonKF, dust_ratio,
                     fcao, pSilo, pKiln, h2o_rawmeal
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                str(uuid.uuid4()), project_id,
-                params.get("stec", 800.0),
-                params.get("clinker_tph", 342.0),
-                params.get("tonKF", 533.0),
-                params.get("dust_ratio", 5.0),
-                params.get("fcao", 1.2),
-                params.get("pSilo", 10.0),
-                params.get("pKiln", 5.0),
-                params.get("h2o_rawmeal", 0.50)
-            ))
-            conn.commit()
+                ON CONFLICT (project_id) DO UPDATE SET
+                    stec = excluded.stec, clinker_tph = excluded.clinker_tph, tonKF = excluded.tonKF,
+                    dust_ratio = excluded.dust_ratio, fcao = excluded.fcao, pSilo = excluded.pSilo,
+                    pKiln = excluded.pKiln, h2o_rawmeal = excluded.h2o_rawmeal
+            """, (_new_id(), project_id, *_general_values({**_GENERAL_DEFAULTS, **params})))
+            self._invalidate(project_id, "general_params")
     
+    @_cached_read("general_params")
     def get_general_params(self, project_id: str) -> Dict:
         """Get general parameters for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT stec, clinker_tph, tonKF, dust_ratio, fcao, pSilo, pKiln, h2o_rawmeal
@@ -325,107 +463,93 @@ class RawMixDatabase:
                         cl: float = 0.0, hpp: float = 0.0, min_percent: float = 0.0,
                         max_percent: float = 100.0) -> str:
         """Add a raw material to a project"""
-        material_id = str(uuid.uuid4())
+        return self.add_raw_materials_bulk(project_id, [(
+            material, h2o, loi, sio2, al2o3, fe2o3, cao, mgo,
+            k2o, na2o, so3, cl, hpp, min_percent, max_percent
+        )])[0]
+    
+    def add_raw_materials_bulk(self, project_id: str, rows: Iterable[tuple]) -> List[str]:
+        """Add raw materials given as (material, h2o, ..., min%, max%) tuples; short rows take the defaults"""
+        defaults = (0.0,) * 13 + (100.0,)
+        records = [(_new_id(), project_id) + tuple(row) + defaults[len(row) - 1:] for row in rows]
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._connect() as conn:
+            conn.executemany("""
                 INSERT INTO raw_materials (
                     id, project_id, material, h2o, loi, sio2, al2o3, fe2o3,
                     cao, mgo, k2o, na2o, so3, cl, hpp, min_percent, max_percent
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                material_id, project_id, material, h2o, loi, sio2, al2o3, fe2o3,
-                cao, mgo, k2o, na2o, so3, cl, hpp, min_percent, max_percent
-            ))
-            conn.commit()
+            """, records)
+            self._invalidate(project_id, "raw_materials")
         
-        return material_id
+        return [record[0] for record in records]
     
+    @_cached_read("raw_materials")
     def get_raw_materials(self, project_id: str) -> pd.DataFrame:
         """Get raw materials for a project as DataFrame"""
-        with sqlite3.connect(self.db_path) as conn:
-            query = """
+        with self._connect() as conn:
+            rows = conn.execute("""
                 SELECT material, h2o, loi, sio2, al2o3, fe2o3, cao, mgo, 
                        k2o, na2o, so3, cl, hpp, min_percent, max_percent
                 FROM raw_materials 
                 WHERE project_id = ? AND is_active = TRUE
                 ORDER BY created_at
-            """
-            df = pd.read_sql_query(query, conn, params=(project_id,))
-            
-            # Rename columns to match existing format
-            df.columns = ["Material","H2O","LOI","SiO2","Al2O3","Fe2O3","CaO","MgO","K2O","Na2O","SO3","Cl","HPP","min%","max%"]
-            return df
+            """, (project_id,)).fetchall()
+        
+        # Build the frame directly in the existing column format
+        columns = ["Material","H2O","LOI","SiO2","Al2O3","Fe2O3","CaO","MgO","K2O","Na2O","SO3","Cl","HPP","min%","max%"]
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        return df.astype({col: "float64" for col in columns[1:]})
     
     def update_raw_materials(self, project_id: str, materials_df: pd.DataFrame):
         """Update all raw materials for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Delete existing materials
             cursor.execute("DELETE FROM raw_materials WHERE project_id = ?", (project_id,))
             
             # Insert updated materials
-            for _, row in materials_df.iterrows():
-                cursor.execute("""
-                    INSERT INTO raw_materials (
-                        id, project_id, material, h2o, loi, sio2, al2o3, fe2o3,
-                        cao, mgo, k2o, na2o, so3, cl, hpp, min_percent, max_percent
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    str(uuid.uuid4()), project_id,
-                    row["Material"], row["H2O"], row["LOI"], row["SiO2"], row["Al2O3"],
-                    row["Fe2O3"], row["CaO"], row["MgO"], row["K2O"], row["Na2O"],
-                    row["SO3"], row["Cl"], row["HPP"], row["min%"], row["max%"]
-                ))
-            
-            conn.commit()
+            columns = ["Material","H2O","LOI","SiO2","Al2O3","Fe2O3","CaO","MgO","K2O","Na2O","SO3","Cl","HPP","min%","max%"]
+            self.add_raw_materials_bulk(project_id, materials_df[columns].itertuples(index=False, name=None))
     
     def delete_raw_material(self, project_id: str, material_name: str):
         """Delete a raw material"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE raw_materials SET is_active = FALSE 
                 WHERE project_id = ? AND material = ?
             """, (project_id, material_name))
-            conn.commit()
+            self._invalidate(project_id, "raw_materials")
     
     # Fuel Methods
     def add_fuel(self, project_id: str, fuel_data: Dict) -> str:
         """Add a fuel to a project"""
-        fuel_id = str(uuid.uuid4())
+        return self.add_fuels_bulk(project_id, [fuel_data])[0]
+    
+    def add_fuels_bulk(self, project_id: str, fuels: Iterable[Dict]) -> List[str]:
+        """Add several fuels to a project with one statement"""
+        records = [
+            (_new_id(), project_id, *_fuel_values({**_FUEL_DEFAULTS, **fuel}))
+            for fuel in fuels
+        ]
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._connect() as conn:
+            conn.executemany("""
                 INSERT INTO fuels (
                     id, project_id, fuel, prop, cv, ash, s, sio2, al2o3, 
                     fe2o3, cao, k2o, na2o, loi
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                fuel_id, project_id,
-                fuel_data.get("Fuel", "New Fuel"),
-                fuel_data.get("prop", 0.0),
-                fuel_data.get("cv", 4000.0),
-                fuel_data.get("ash", 15.0),
-                fuel_data.get("S", 0.3),
-                fuel_data.get("SiO2", 50.0),
-                fuel_data.get("Al2O3", 25.0),
-                fuel_data.get("Fe2O3", 15.0),
-                fuel_data.get("CaO", 5.0),
-                fuel_data.get("K2O", 2.0),
-                fuel_data.get("Na2O", 1.0),
-                fuel_data.get("LOI", 0.0)
-            ))
-            conn.commit()
+            """, records)
+            self._invalidate(project_id, "fuels")
         
-        return fuel_id
+        return [record[0] for record in records]
     
+    @_cached_read("fuels")
     def get_fuels(self, project_id: str) -> List[Dict]:
         """Get fuels for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT fuel, prop, cv, ash, s, sio2, al2o3, fe2o3, cao, k2o, na2o, loi
@@ -439,69 +563,38 @@ class RawMixDatabase:
     
     def update_fuels(self, project_id: str, fuel_data: List[Dict]):
         """Update all fuels for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Delete existing fuels
             cursor.execute("DELETE FROM fuels WHERE project_id = ?", (project_id,))
             
             # Insert updated fuels
-            for fuel in fuel_data:
-                cursor.execute("""
-                    INSERT INTO fuels (
-                        id, project_id, fuel, prop, cv, ash, s, sio2, al2o3, 
-                        fe2o3, cao, k2o, na2o, loi
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    str(uuid.uuid4()), project_id,
-                    fuel.get("Fuel", "New Fuel"),
-                    fuel.get("prop", 0.0),
-                    fuel.get("cv", 4000.0),
-                    fuel.get("ash", 15.0),
-                    fuel.get("S", 0.3),
-                    fuel.get("SiO2", 50.0),
-                    fuel.get("Al2O3", 25.0),
-                    fuel.get("Fe2O3", 15.0),
-                    fuel.get("CaO", 5.0),
-                    fuel.get("K2O", 2.0),
-                    fuel.get("Na2O", 1.0),
-                    fuel.get("LOI", 0.0)
-                ))
-            
-            conn.commit()
+            self.add_fuels_bulk(project_id, fuel_data)
     
     # Constraints Methods
     def save_constraints(self, project_id: str, constraints: Dict):
         """Save constraints for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
-            # Delete existing constraints
-            cursor.execute("DELETE FROM constraints WHERE project_id = ?", (project_id,))
-            
-            # Insert new constraints
+            # One row per project: update it in place when it exists
             cursor.execute("""
                 INSERT INTO constraints (
                     id, project_id, lsf_min, lsf_max, sm_min, sm_max,
                     am_min, am_max, naeq_max, c3s_min, c3s_max
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                str(uuid.uuid4()), project_id,
-                constraints.get("LSF_min", 95.5),
-                constraints.get("LSF_max", 96.5),
-                constraints.get("SM_min", 2.28),
-                constraints.get("SM_max", 2.32),
-                constraints.get("AM_min", 1.55),
-                constraints.get("AM_max", 1.60),
-                constraints.get("NaEq_max", 0.60),
-                constraints.get("C3S_min", 58.0),
-                constraints.get("C3S_max", 65.0)
-            ))
-            conn.commit()
+                ON CONFLICT (project_id) DO UPDATE SET
+                    lsf_min = excluded.lsf_min, lsf_max = excluded.lsf_max, sm_min = excluded.sm_min,
+                    sm_max = excluded.sm_max, am_min = excluded.am_min, am_max = excluded.am_max,
+                    naeq_max = excluded.naeq_max, c3s_min = excluded.c3s_min, c3s_max = excluded.c3s_max
+            """, (_new_id(), project_id, *_constraints_values({**_CONSTRAINTS_DEFAULTS, **constraints})))
+            self._invalidate(project_id, "constraints")
     
+    @_cached_read("constraints")
     def get_constraints(self, project_id: str) -> Dict:
         """Get constraints for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT lsf_min, lsf_max, sm_min, sm_max, am_min, am_max,
@@ -523,37 +616,27 @@ class RawMixDatabase:
     # Dust Composition Methods
     def save_dust_composition(self, project_id: str, dust: Dict):
         """Save dust composition for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
-            # Delete existing dust composition
-            cursor.execute("DELETE FROM dust_composition WHERE project_id = ?", (project_id,))
-            
-            # Insert new dust composition
+            # One row per project: update it in place when it exists
             cursor.execute("""
                 INSERT INTO dust_composition (
                     id, project_id, h2o, loi, sio2, al2o3, fe2o3,
                     cao, mgo, k2o, na2o, so3, cl
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                str(uuid.uuid4()), project_id,
-                dust.get("H2O", 0.5),
-                dust.get("LOI", 40.0),
-                dust.get("SiO2", 10.6),
-                dust.get("Al2O3", 3.76),
-                dust.get("Fe2O3", 2.23),
-                dust.get("CaO", 45.90),
-                dust.get("MgO", 0.54),
-                dust.get("K2O", 0.12),
-                dust.get("Na2O", 0.39),
-                dust.get("SO3", 0.02),
-                dust.get("Cl", 0.02)
-            ))
-            conn.commit()
+                ON CONFLICT (project_id) DO UPDATE SET
+                    h2o = excluded.h2o, loi = excluded.loi, sio2 = excluded.sio2,
+                    al2o3 = excluded.al2o3, fe2o3 = excluded.fe2o3, cao = excluded.cao,
+                    mgo = excluded.mgo, k2o = excluded.k2o, na2o = excluded.na2o,
+                    so3 = excluded.so3, cl = excluded.cl
+            """, (_new_id(), project_id, *_dust_values({**_DUST_DEFAULTS, **dust})))
+            self._invalidate(project_id, "dust_composition")
     
+    @_cached_read("dust_composition")
     def get_dust_composition(self, project_id: str) -> Dict:
         """Get dust composition for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT h2o, loi, sio2, al2o3, fe2o3, cao, mgo, k2o, na2o, so3, cl
@@ -573,9 +656,9 @@ class RawMixDatabase:
     # Results History Methods
     def save_result(self, project_id: str, results: Dict, calculation_time: float = 0.0):
         """Save optimization results"""
-        result_id = str(uuid.uuid4())
+        result_id = _new_id()
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO results_history (
@@ -584,19 +667,19 @@ class RawMixDatabase:
                 ) VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
                 result_id, project_id,
-                json.dumps(results.get("solution", {})),
-                json.dumps(results.get("meta", {})),
+                _pack_json(results.get("solution", {})),
+                _pack_json(results.get("meta", {})),
                 sum(results.get("solution", {}).values()) if results.get("solution") else 0.0,
                 results.get("status", 0),
                 calculation_time
             ))
-            conn.commit()
         
         return result_id
     
-    def get_results_history(self, project_id: str, limit: int = 10) -> List[Dict]:
-        """Get results history for a project"""
-        with sqlite3.connect(self.db_path) as conn:
+    def iter_results_history(self, project_id: str, limit: int = 10) -> Iterator[Dict]:
+        """Yield results history rows, unpacking each payload only when consumed"""
+        # Rows are fetched under the lock; the generator never holds it while suspended
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, solution_data, meta_data, total_cost, solver_status,
@@ -608,14 +691,43 @@ class RawMixDatabase:
             """, (project_id, limit))
             
             columns = [desc[0] for desc in cursor.description]
-            results = []
-            for row in cursor.fetchall():
-                result = dict(zip(columns, row))
-                result["solution_data"] = json.loads(result["solution_data"])
-                result["meta_data"] = json.loads(result["meta_data"]) if result["meta_data"] else {}
-                results.append(result)
+            rows = cursor.fetchall()
+        
+        for row in rows:
+            result = dict(zip(columns, row))
+            result["solution_data"] = _unpack_json(result["solution_data"])
+            result["meta_data"] = _unpack_json(result["meta_data"])
+            yield result
+    
+    def get_results_history(self, project_id: str, limit: int = 10) -> List[Dict]:
+        """Get results history for a project"""
+        return list(self.iter_results_history(project_id, limit))
+    
+    def get_results_history_summary(self, project_id: str, limit: int = 10) -> List[Dict]:
+        """Get results history for a project without the solution and meta payloads"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, solver_status, calculation_time, created_at
+                FROM results_history 
+                WHERE project_id = ?
+                ORDER BY created_at DESC
+                LIMIT ?
+            """, (project_id, limit))
             
-            return results
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_result_detail(self, result_id: str) -> Optional[Dict]:
+        """Get the solution and meta data of one stored result"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT solution_data, meta_data FROM results_history WHERE id = ?", (result_id,))
+            row = cursor.fetchone()
+        
+        if not row:
+            return None
+        return {"solution_data": _unpack_json(row[0]), "meta_data": _unpack_json(row[1])}
     
     # Export/Import Methods
     def export_project(self, project_id: str) -> Dict:
@@ -631,25 +743,27 @@ class RawMixDatabase:
     
     def import_project(self, name: str, project_data: Dict, description: str = "", user_id: str = None) -> str:
         """Import project from data"""
-        project_id = self.create_project(name, description, user_id=user_id)
-        
-        # Import each data type
-        if "general" in project_data:
-            self.save_general_params(project_id, project_data["general"])
-        
-        if "raw_materials" in project_data:
-            materials_df = pd.DataFrame(project_data["raw_materials"])
-            self.update_raw_materials(project_id, materials_df)
-        
-        if "fuels" in project_data:
-            self.update_fuels(project_id, project_data["fuels"])
-        
-        if "constraints" in project_data:
-            self.save_constraints(project_id, project_data["constraints"])
-        
-        if "dust" in project_data:
-            self.save_dust_composition(project_id, project_data["dust"])
-        
+        # Create and fill the project atomically
+        with self._connect():
+            project_id = self.create_project(name, description, user_id=user_id)
+            
+            # Import each data type
+            if "general" in project_data:
+                self.save_general_params(project_id, project_data["general"])
+            
+            if "raw_materials" in project_data:
+                materials_df = pd.DataFrame(project_data["raw_materials"])
+                self.update_raw_materials(project_id, materials_df)
+            
+            if "fuels" in project_data:
+                self.update_fuels(project_id, project_data["fuels"])
+            
+            if "constraints" in project_data:
+                self.save_constraints(project_id, project_data["constraints"])
+            
+            if "dust" in project_data:
+                self.save_dust_composition(project_id, project_data["dust"])
+            
         return project_id
 
 # Initialize global database instance
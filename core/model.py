@@ -1,5 +1,36 @@
+import threading
+
 import pulp
 
+# In-process HiGHS (optional highspy package) avoids spawning CBC for every solve;
+# pulp releases before the highspy interface have no pulp.HiGHS and use CBC
+_HIGHS = getattr(pulp, "HiGHS", None)
+_HIGHS_AVAILABLE = _HIGHS is not None and _HIGHS(msg=False).available()
+
+
+def _solver(warm_start=False):
+	# PuLP's HiGHS interface ignores initial values; only CBC uses warmStart
+	if _HIGHS_AVAILABLE:
+		return _HIGHS(msg=False)
+	return pulp.PULP_CBC_CMD(msg=False, warmStart=warm_start)
+
+
+# Solved LPs keyed by their frozen inputs, shared by every session thread (FIFO, 128 entries)
+_solve_cache = {}
+_SOLVE_CACHE_SIZE = 128
+_solve_cache_lock = threading.Lock()
+
+
+def _freeze(value):
+	"""Hashable form of nested dict/list/array inputs"""
+	if isinstance(value, dict):
+		return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+	if hasattr(value, "tolist"):
+		value = value.tolist()
+	if isinstance(value, (list, tuple)):
+		return tuple(_freeze(v) for v in value)
+	return value
+
 
 def solve_rawmix(
 	RM,
@@ -21,7 +52,16 @@ def solve_rawmix(
 	FCaO_cl=1.0,
 	epsilon=1e-3,
 	objective_mode="feasibility",
+	warm_start=None,
 ):
+	# warm_start only seeds the CBC fallback, so it stays out of the key
+	key = _freeze({k: v for k, v in locals().items() if k != "warm_start"})
+	with _solve_cache_lock:
+		cached = _solve_cache.get(key)
+	if cached is not None:
+		status, sol, meta = cached
+		return status, dict(sol), dict(meta)
+
 	# 1) constants
 	tonDustLoss = dust_ratio * clinkerTPH
 	D = tonKF - tonDustLoss + totalAshTPH
@@ -35,9 +75,9 @@ def solve_rawmix(
 	# 4) sum to 100
 	m += pulp.lpSum(x.values()) == 100, "Sum100"
 
-	# 5) raw meal oxides
+	# 5) raw meal oxides, built straight from (variable, coefficient) pairs
 	def ox_rm(ox):
-		return pulp.lpSum(x[k] * RM[k][ox] for k in x) / 100.0
+		return pulp.LpAffineExpression([(x[k], RM[k][ox] / 100.0) for k in x])
 
 	Si_RM, Al_RM = ox_rm("SiO2"), ox_rm("Al2O3")
 	Fe_RM, Ca_RM = ox_rm("Fe2O3"), ox_rm("CaO")
@@ -96,15 +136,27 @@ def solve_rawmix(
 
 	# 9) objective
 	if objective_mode == "cost":
-		m += pulp.lpSum(x[k] * costs[k] for k in x)
+		m += pulp.LpAffineExpression([(x[k], costs[k]) for k in x])
 	else:
-		m += epsilon * pulp.lpSum(x[k] * costs[k] for k in x)
-
-	# 10) solve
-	status = m.solve(pulp.PULP_CBC_CMD(msg=False))
-	sol = {k: x[k].value() for k in x}
-	return status, sol, {
+		m += pulp.LpAffineExpression([(x[k], epsilon * costs[k]) for k in x])
+
+	# 10) solve; the CBC fallback is seeded with the previous proportions when given
+	use_warm_start = bool(warm_start) and not _HIGHS_AVAILABLE
+	if use_warm_start:
+		for k in x:
+			if warm_start.get(k) is not None:
+				x[k].setInitialValue(warm_start[k])
+	status = m.solve(_solver(use_warm_start))
+	# Round away solver noise so bound-tight moduli compare the same as with CBC
+	sol = {k: round(x[k].value(), 9) if x[k].value() is not None else None for k in x}
+	meta = {
 		"C3S_lin": C3S_lin.value(),
 		"Z": Z.value(),
 		"LOI_u": LOI_u.value(),
 	}
+
+	with _solve_cache_lock:
+		_solve_cache[key] = (status, sol, meta)
+		if len(_solve_cache) > _SOLVE_CACHE_SIZE:
+			del _solve_cache[next(iter(_solve_cache))]
+	return status, dict(sol), dict(meta)
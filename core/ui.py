@@ -1,16 +1,23 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import orjson
+import gzip
+import hashlib
 import time
 import os
 from datetime import datetime
-from .compute import calculate_all_stages, calculate_quality_moduli, compute_bogue, compute_cv_total, compute_total_fuel_tph
+from .compute import calculate_all_stages, calculate_quality_moduli, calculate_quality_moduli_batch, compute_bogue, compute_cv_total, compute_total_fuel_tph, fuel_arrays
+from .database import db
 from .auth import auth_manager, AuthenticationError, get_auth_config
 
 RAW_MIX_COLUMNS = [
 	"Material","H2O","LOI","SiO2","Al2O3","Fe2O3","CaO","MgO","K2O","Na2O","SO3","Cl","HPP","min%","max%"
 ]
 
+# Explicit dtypes so pandas skips per-column inference
+RAW_MIX_DTYPES = {col: ("string" if col == "Material" else "float64") for col in RAW_MIX_COLUMNS}
+
 DEFAULT_RM = [
 	["LS",7.50,43.00,1.07,1.24,0.55,53.28,0.26,0.04,0.03,0.05,0.01,48632,0,100],
 	["CY",16.00,13.87,67.00,15.27,9.09,1.28,1.42,1.18,0.58,0.12,0.01,79130,0,100],
@@ -18,8 +25,34 @@ DEFAULT_RM = [
 	["CS",3.20,0.00,35.40,4.28,52.06,5.77,2.17,0.03,0.01,0.03,0.00,353510,0,100],
 ]
 
+# Built once; callers take a copy before editing
+_DEFAULT_RM_DF = pd.DataFrame.from_records(DEFAULT_RM, columns=RAW_MIX_COLUMNS).astype(RAW_MIX_DTYPES)
+
+DEFAULT_FUELS = (
+	{"Fuel":"Fine Coal","prop":75.3,"cv":4800,"ash":14.0,"S":0.3,"SiO2":11.87,"Al2O3":9.03,"Fe2O3":51.37,"CaO":4.0,"K2O":0.20,"Na2O":0.30,"LOI":0.0},
+	{"Fuel":"Sekam","prop":19.5,"cv":2500,"ash":25.0,"S":0.3,"SiO2":95.0,"Al2O3":0.17,"Fe2O3":0.35,"CaO":0.91,"K2O":0.11,"Na2O":0.43,"LOI":0.0},
+	{"Fuel":"SBE","prop":1.2,"cv":1800,"ash":65.0,"S":0.5,"SiO2":64.0,"Al2O3":16.0,"Fe2O3":1.2,"CaO":1.2,"K2O":1.54,"Na2O":2.25,"LOI":0.0},
+	{"Fuel":"Tankos","prop":4.0,"cv":3000,"ash":11.0,"S":0.2,"SiO2":40.0,"Al2O3":10.0,"Fe2O3":2.0,"CaO":10.0,"K2O":0.11,"Na2O":30.0,"LOI":0.0},
+)
+
 DEFAULT_DUST = {"H2O":0.0,"LOI":10.06,"SiO2":3.76,"Al2O3":2.23,"Fe2O3":45.90,"CaO":40.00,"MgO":0.54,"K2O":0.12,"Na2O":0.39,"SO3":0.02,"Cl":0.02}
 
+# Fuel editor columns; Streamlit copies these per call
+_FUEL_COLUMN_CONFIG = {
+	"Fuel": st.column_config.TextColumn("Fuel Name", help="Name of the fuel", width="medium"),
+	"prop": st.column_config.NumberColumn("Prop (%)", help="Proportion percentage (auto-calculated for Fine Coal)", format="%.1f", min_value=0.0, max_value=100.0),
+	"cv": st.column_config.NumberColumn("CV (kcal/kg)", help="Calorific Value", format="%.0f", min_value=0),
+	"ash": st.column_config.NumberColumn("Ash (%)", help="Ash content", format="%.1f", min_value=0.0, max_value=100.0),
+	"S": st.column_config.NumberColumn("S (%)", help="Sulfur content", format="%.2f", min_value=0.0),
+	"SiO2": st.column_config.NumberColumn("SiO2 (%)", help="Silicon Dioxide", format="%.2f", min_value=0.0, max_value=100.0),
+	"Al2O3": st.column_config.NumberColumn("Al2O3 (%)", help="Aluminum Oxide", format="%.2f", min_value=0.0, max_value=100.0),
+	"Fe2O3": st.column_config.NumberColumn("Fe2O3 (%)", help="Iron Oxide", format="%.2f", min_value=0.0, max_value=100.0),
+	"CaO": st.column_config.NumberColumn("CaO (%)", help="Calcium Oxide", format="%.2f", min_value=0.0, max_value=100.0),
+	"K2O": st.column_config.NumberColumn("K2O (%)", help="Potassium Oxide", format="%.2f", min_value=0.0, max_value=100.0),
+	"Na2O": st.column_config.NumberColumn("Na2O (%)", help="Sodium Oxide", format="%.2f", min_value=0.0, max_value=100.0),
+	"LOI": st.column_config.NumberColumn("LOI (%)", help="Loss on Ignition", format="%.2f", min_value=0.0, max_value=100.0),
+}
+
 
 def build_general_tab(general: dict, dust: dict):
 	st.subheader("General")
@@ -77,9 +110,16 @@ def build_general_tab(general: dict, dust: dict):
 
 	st.markdown("**Dust composition**")
 	dust = dust or DEFAULT_DUST.copy()
-	cols = st.columns(len(dust))
-	for i,k in enumerate(dust):
-		dust[k] = cols[i].number_input(k, value=float(dust[k]), key=f"dust_{k}_input")
+	# One single-row editor instead of a number_input per oxide
+	edited = st.data_editor(
+		pd.DataFrame([dust], dtype="float64"),
+		num_rows="fixed",
+		hide_index=True,
+		use_container_width=True,
+		key="dust_editor",
+		column_config={k: st.column_config.NumberColumn(k, format="%.2f", min_value=0.0, max_value=100.0) for k in dust},
+	)
+	dust = {k: float(v) for k, v in edited.iloc[0].fillna(0.0).items()}
 
 	return {
 		"stec": stec,
@@ -96,7 +136,7 @@ def build_general_tab(general: dict, dust: dict):
 def build_rawmix_tab(rm_df: pd.DataFrame):
 	st.subheader("Raw Mix (dry basis)")
 	if rm_df is None or rm_df.empty:
-		rm_df = pd.DataFrame(DEFAULT_RM, columns=RAW_MIX_COLUMNS)
+		rm_df = _DEFAULT_RM_DF.copy()
 	rm_df = st.data_editor(rm_df, num_rows="dynamic", use_container_width=True, key="rm_data_editor")
 	
 	# Calculate and display moduli for each individual material (with caching)
@@ -106,39 +146,21 @@ def build_rawmix_tab(rm_df: pd.DataFrame):
 			st.caption("Quality moduli for each raw material individually")
 			
 			try:
-				# Calculate moduli for each material
-				moduli_data = []
-				
-				for _, row in rm_df.iterrows():
-					material_name = str(row.get('Material', '')).strip()
-					if not material_name:
-						continue
-					
-					# Extract composition for this material
-					composition = {
-						"SiO2": float(row.get("SiO2", 0.0) or 0.0),
-						"Al2O3": float(row.get("Al2O3", 0.0) or 0.0),
-						"Fe2O3": float(row.get("Fe2O3", 0.0) or 0.0),
-						"CaO": float(row.get("CaO", 0.0) or 0.0),
-						"K2O": float(row.get("K2O", 0.0) or 0.0),
-						"Na2O": float(row.get("Na2O", 0.0) or 0.0)
-					}
-					
-					# Calculate moduli for this material
-					moduli = calculate_quality_moduli(composition)
-					
-					# Add to data list
-					moduli_data.append({
-						"Material": material_name,
-						"LSF": f"{moduli['LSF']:.2f}",
-						"SM": f"{moduli['SM']:.2f}",
-						"AM": f"{moduli['AM']:.2f}",
-						"NaEq": f"{moduli['NaEq']:.3f}"
-					})
+				# Calculate moduli for all named materials at once
+				names = _material_names(rm_df)
+				keep = [i for i, name in enumerate(names) if name]
+				moduli = calculate_quality_moduli_batch({ox: _column_values(rm_df, ox) for ox in ("SiO2", "Al2O3", "Fe2O3", "CaO", "K2O", "Na2O")})
+				moduli_data = pd.DataFrame({
+					"Material": [names[i] for i in keep],
+					"LSF": [f"{v:.2f}" for v in moduli["LSF"][keep]],
+					"SM": [f"{v:.2f}" for v in moduli["SM"][keep]],
+					"AM": [f"{v:.2f}" for v in moduli["AM"][keep]],
+					"NaEq": [f"{v:.3f}" for v in moduli["NaEq"][keep]],
+				})
 				
-				if moduli_data:
+				if not moduli_data.empty:
 					# Display moduli table
-					st.dataframe(pd.DataFrame(moduli_data), use_container_width=True)
+					st.dataframe(moduli_data, use_container_width=True)
 					
 					# Show additional info
 					st.info("💡 These are the quality moduli for each individual raw material. The final raw mix moduli will depend on the optimized proportions of these materials.")
@@ -149,22 +171,20 @@ def build_rawmix_tab(rm_df: pd.DataFrame):
 	return rm_df
 
 
+def _nan_to_none(value):
+	# NaN hashes by identity, so blank cells would look changed on every rerun
+	return None if value != value else value
+
+
 def build_fuel_tab(fuel_rows: list):
 	st.subheader("Fuels")
 	st.caption("Fine Coal proportion is automatically calculated. Other fuel prop% can be 0 for unused fuels")
 	
 	# Initialize with defaults if empty
 	if not fuel_rows:
-		fuel_rows = [
-			{"Fuel":"Fine Coal","prop":75.3,"cv":4800,"ash":14.0,"S":0.3,"SiO2":11.87,"Al2O3":9.03,"Fe2O3":51.37,"CaO":4.0,"K2O":0.20,"Na2O":0.30,"LOI":0.0},
-			{"Fuel":"Sekam","prop":19.5,"cv":2500,"ash":25.0,"S":0.3,"SiO2":95.0,"Al2O3":0.17,"Fe2O3":0.35,"CaO":0.91,"K2O":0.11,"Na2O":0.43,"LOI":0.0},
-			{"Fuel":"SBE","prop":1.2,"cv":1800,"ash":65.0,"S":0.5,"SiO2":64.0,"Al2O3":16.0,"Fe2O3":1.2,"CaO":1.2,"K2O":1.54,"Na2O":2.25,"LOI":0.0},
-			{"Fuel":"Tankos","prop":4.0,"cv":3000,"ash":11.0,"S":0.2,"SiO2":40.0,"Al2O3":10.0,"Fe2O3":2.0,"CaO":10.0,"K2O":0.11,"Na2O":30.0,"LOI":0.0},
-		]
-	
-	# Session state for managing fuel data and auto-calculation
-	if "fuel_data_state" not in st.session_state:
-		st.session_state.fuel_data_state = fuel_rows.copy()
+		fuel_rows = [dict(fuel) for fuel in DEFAULT_FUELS]
+	
+	# Session state for fuel auto-calculation
 	if "prev_fuel_hash" not in st.session_state:
 		st.session_state.prev_fuel_hash = None
 	
@@ -207,31 +227,18 @@ def build_fuel_tab(fuel_rows: list):
 		use_container_width=True, 
 		key="fuel_data_editor",
 		hide_index=False,
-		column_config={
-			"Fuel": st.column_config.TextColumn("Fuel Name", help="Name of the fuel", width="medium"),
-			"prop": st.column_config.NumberColumn("Prop (%)", help="Proportion percentage (auto-calculated for Fine Coal)", format="%.1f", min_value=0.0, max_value=100.0),
-			"cv": st.column_config.NumberColumn("CV (kcal/kg)", help="Calorific Value", format="%.0f", min_value=0),
-			"ash": st.column_config.NumberColumn("Ash (%)", help="Ash content", format="%.1f", min_value=0.0, max_value=100.0),
-			"S": st.column_config.NumberColumn("S (%)", help="Sulfur content", format="%.2f", min_value=0.0),
-			"SiO2": st.column_config.NumberColumn("SiO2 (%)", help="Silicon Dioxide", format="%.2f", min_value=0.0, max_value=100.0),
-			"Al2O3": st.column_config.NumberColumn("Al2O3 (%)", help="Aluminum Oxide", format="%.2f", min_value=0.0, max_value=100.0),
-			"Fe2O3": st.column_config.NumberColumn("Fe2O3 (%)", help="Iron Oxide", format="%.2f", min_value=0.0, max_value=100.0),
-			"CaO": st.column_config.NumberColumn("CaO (%)", help="Calcium Oxide", format="%.2f", min_value=0.0, max_value=100.0),
-			"K2O": st.column_config.NumberColumn("K2O (%)", help="Potassium Oxide", format="%.2f", min_value=0.0, max_value=100.0),
-			"Na2O": st.column_config.NumberColumn("Na2O (%)", help="Sodium Oxide", format="%.2f", min_value=0.0, max_value=100.0),
-			"LOI": st.column_config.NumberColumn("LOI (%)", help="Loss on Ignition", format="%.2f", min_value=0.0, max_value=100.0)
-		}
+		column_config=_FUEL_COLUMN_CONFIG,
 	)
 	
 	# Convert to dict format
 	fuel_data = edited_fuel_df.to_dict(orient="records")
 	
 	# Create hash of current fuel data (excluding Fine Coal prop for change detection)
-	fuel_hash_data = []
-	for fuel in fuel_data:
-		if not ("fine coal" in str(fuel.get("Fuel", "")).lower()):
-			fuel_hash_data.append(str(fuel))
-	current_hash = hash(str(fuel_hash_data))
+	current_hash = hash(tuple(
+		tuple(_nan_to_none(fuel.get(k)) for k in cols)
+		for fuel in fuel_data
+		if not ("fine coal" in str(fuel.get("Fuel", "")).lower())
+	))
 	
 	# Auto-calculate Fine Coal proportion when other fuels change or manual button pressed
 	if (current_hash != st.session_state.prev_fuel_hash) or manual_calc:
@@ -240,15 +247,15 @@ def build_fuel_tab(fuel_rows: list):
 		if manual_calc:
 			st.success("✅ Fine Coal proportion recalculated!")
 	
-	# Update session state
-	st.session_state.fuel_data_state = fuel_data.copy()
-	
 	# Display current fuel proportions with enhanced styling
 	st.subheader("Current Fuel Proportions")
-	total_prop = sum(f.get("prop", 0) for f in fuel_data)
+	# Column arrays shared by the totals and the summary table
+	arr = fuel_arrays(fuel_data)
+	total_prop = float(arr["prop"].sum())
 	
 	# Calculate total fuel TPH using general parameters if available
 	total_fuel_tph = 0.0
+	cv_total = 0.0
 	try:
 		if hasattr(st.session_state, 'state') and 'general' in st.session_state.state:
 			g = st.session_state.state.get("general", {})
@@ -256,7 +263,7 @@ def build_fuel_tab(fuel_rows: list):
 			clinker_tph = g.get("clinker_tph", 342.0)
 			
 			# Calculate CV total from current fuel data
-			cv_total = compute_cv_total(fuel_data)
+			cv_total = compute_cv_total(arr)
 			
 			if cv_total > 0:
 				total_fuel_tph = compute_total_fuel_tph(stec, clinker_tph, cv_total)
@@ -264,48 +271,34 @@ def build_fuel_tab(fuel_rows: list):
 		# If session state is not available, use default calculation
 		pass
 	
-	prop_summary = []
-	for fuel in fuel_data:
-		fuel_name = fuel.get("Fuel", "Unknown")
-		prop = fuel.get("prop", 0)
-		cv = fuel.get("cv", 0)
-		ash = fuel.get("ash", 0)
-		
-		# Calculate individual fuel tonnage
-		fuel_tonnage_tph = (prop / 100.0) * total_fuel_tph if total_fuel_tph > 0 else 0.0
-		
-		# Status icons and styling
-		if "fine coal" in fuel_name.lower():
-			status_icon = "🔥"
-			status_text = "Auto-calculated"
-		elif prop > 0:
-			status_icon = "🌱"
-			status_text = "Active"
-		else:
-			status_icon = "⚪"
-			status_text = "Inactive"
-		
-		prop_summary.append({
-			"Status": status_icon,
-			"Fuel": fuel_name,
-			"Proportion (%)": f"{prop:.1f}%",
-			"CV (kcal/kg)": f"{cv:.0f}",
-			"Ash (%)": f"{ash:.1f}%",
-			"Tonnage (TPH)": f"{fuel_tonnage_tph:.1f}",
-			"Note": status_text
-		})
+	# Status icons and styling per fuel
+	fuel_names = [str(fuel.get("Fuel", "Unknown")) for fuel in fuel_data]
+	is_fine_coal = np.array(["fine coal" in name.lower() for name in fuel_names], dtype=bool)
+	active = arr["prop"] > 0
+	tonnage = arr["prop"] / 100.0 * total_fuel_tph if total_fuel_tph > 0 else np.zeros_like(arr["prop"])
+	prop_summary = {
+		"Status": np.where(is_fine_coal, "🔥", np.where(active, "🌱", "⚪")).tolist(),
+		"Fuel": fuel_names,
+		"Proportion (%)": [f"{v:.1f}%" for v in arr["prop"]],
+		"CV (kcal/kg)": [f"{v:.0f}" for v in arr["cv"]],
+		"Ash (%)": [f"{v:.1f}%" for v in arr["ash"]],
+		"Tonnage (TPH)": [f"{v:.1f}" for v in tonnage],
+		"Note": np.where(is_fine_coal, "Auto-calculated", np.where(active, "Active", "Inactive")).tolist(),
+	}
 	
 	# Add summary row with totals
 	if total_fuel_tph > 0:
-		prop_summary.append({
+		total_row = {
 			"Status": "📊",
 			"Fuel": "TOTAL",
 			"Proportion (%)": f"{total_prop:.1f}%",
-			"CV (kcal/kg)": f"{compute_cv_total(fuel_data):.0f}" if fuel_data else "0",
+			"CV (kcal/kg)": f"{cv_total:.0f}",
 			"Ash (%)": "-",
 			"Tonnage (TPH)": f"{total_fuel_tph:.1f}",
 			"Note": "Total Fuel"
-		})
+		}
+		for key, value in total_row.items():
+			prop_summary[key].append(value)
 	
 	st.dataframe(pd.DataFrame(prop_summary), use_container_width=True, hide_index=True)
 	
@@ -344,7 +337,7 @@ def build_fuel_tab(fuel_rows: list):
 		
 		# Show current calculation parameters
 		if total_fuel_tph > 0:
-			st.info(f"📊 **Current Parameters**: Total Fuel = {total_fuel_tph:.1f} TPH | CV Total = {compute_cv_total(fuel_data):.0f} kcal/kg")
+			st.info(f"📊 **Current Parameters**: Total Fuel = {total_fuel_tph:.1f} TPH | CV Total = {cv_total:.0f} kcal/kg")
 	
 	return fuel_data
 
@@ -352,35 +345,27 @@ def build_fuel_tab(fuel_rows: list):
 def auto_calculate_fine_coal_proportion(fuel_data: list) -> list:
 	"""Automatically calculate Fine Coal proportion based on other fuels"""
 	try:
-		# Find Fine Coal and calculate other fuels total
-		fine_coal_index = None
-		other_fuels_total = 0.0
-		
-		for i, fuel in enumerate(fuel_data):
-			fuel_name = str(fuel.get("Fuel", "")).strip().lower()
-			prop = float(fuel.get("prop", 0) or 0)
-			
-			# Check if this is Fine Coal (case insensitive, flexible matching)
-			if any(term in fuel_name for term in ["fine coal", "finecoal", "coal fine", "fine_coal"]):
-				fine_coal_index = i
-			else:
-				# Sum all other fuel proportions
-				other_fuels_total += prop
+		# Fine Coal mask (case insensitive, flexible matching) and proportions as arrays
+		names = [str(fuel.get("Fuel", "")).strip().lower() for fuel in fuel_data]
+		is_fc = np.array([any(term in name for term in ("fine coal", "finecoal", "coal fine", "fine_coal")) for name in names], dtype=bool)
+		if not is_fc.any():
+			return fuel_data
+		props = np.array([float(fuel.get("prop", 0) or 0) for fuel in fuel_data], dtype=np.float64)
+		fine_coal_index = int(np.flatnonzero(is_fc)[-1])
+		other_fuels_total = float(props[~is_fc].sum())
 		
 		# Calculate Fine Coal proportion to balance to 100%
-		if fine_coal_index is not None:
-			fine_coal_prop = max(0, min(100, 100 - other_fuels_total))
-			fuel_data[fine_coal_index]["prop"] = fine_coal_prop
-			
-			# If other fuels exceed 100%, proportionally reduce them
-			if other_fuels_total > 100:
-				reduction_factor = 95 / other_fuels_total  # Leave 5% for Fine Coal minimum
-				for i, fuel in enumerate(fuel_data):
-					if i != fine_coal_index:
-						fuel["prop"] = fuel.get("prop", 0) * reduction_factor
-				# Recalculate Fine Coal after reduction
-				new_other_total = sum(fuel.get("prop", 0) for i, fuel in enumerate(fuel_data) if i != fine_coal_index)
-				fuel_data[fine_coal_index]["prop"] = max(5, 100 - new_other_total)
+		fuel_data[fine_coal_index]["prop"] = max(0.0, min(100.0, 100 - other_fuels_total))
+		
+		# If other fuels exceed 100%, proportionally reduce them
+		if other_fuels_total > 100:
+			rest = np.ones(len(fuel_data), dtype=bool)
+			rest[fine_coal_index] = False
+			props[rest] *= 95 / other_fuels_total  # Leave 5% for Fine Coal minimum
+			for i in np.flatnonzero(rest):
+				fuel_data[i]["prop"] = float(props[i])
+			# Recalculate Fine Coal after reduction
+			fuel_data[fine_coal_index]["prop"] = max(5.0, 100 - float(props[rest].sum()))
 		
 		return fuel_data
 	
@@ -415,42 +400,62 @@ def build_constraints_tab(cons: dict):
 	}
 
 
-def to_rm_dict(rm_df: pd.DataFrame) -> dict:
-	RM = {}
-	for _, r in rm_df.iterrows():
-		name = str(r["Material"]).strip()
+def _material_names(rm_df: pd.DataFrame) -> list:
+	return [str(m).strip() for m in rm_df["Material"].tolist()]
+
+
+def _column_values(rm_df: pd.DataFrame, col: str, default: float = 0.0) -> list:
+	"""Column as Python floats with blanks replaced by the default"""
+	if col not in rm_df.columns:
+		return [default] * len(rm_df)
+	return [float(v or default) for v in rm_df[col].tolist()]
+
+
+def rm_df_to_dicts(rm_df: pd.DataFrame):
+	"""Solver inputs (RM, bounds, costs) from one pass over the raw mix table"""
+	oxides = ("SiO2", "Al2O3", "Fe2O3", "CaO", "K2O", "Na2O", "LOI")
+	cols = [_column_values(rm_df, ox) for ox in oxides]
+	lows, highs = _column_values(rm_df, "min%"), _column_values(rm_df, "max%", 100.0)
+	RM, b, c = {}, {}, {}
+	for name, lo, hi, hpp, *values in zip(_material_names(rm_df), lows, highs, _column_values(rm_df, "HPP"), *cols):
 		if not name:
 			continue
-		RM[name] = {
-			"SiO2": float(r.get("SiO2", 0.0) or 0.0),
-			"Al2O3": float(r.get("Al2O3", 0.0) or 0.0),
-			"Fe2O3": float(r.get("Fe2O3", 0.0) or 0.0),
-			"CaO": float(r.get("CaO", 0.0) or 0.0),
-			"K2O": float(r.get("K2O", 0.0) or 0.0),
-			"Na2O": float(r.get("Na2O", 0.0) or 0.0),
-			"LOI": float(r.get("LOI", 0.0) or 0.0),
-		}
-	return RM
+		RM[name] = dict(zip(oxides, values))
+		b[name] = (lo, hi)
+		c[name] = hpp
+	return RM, b, c
+
+
+def to_rm_dict(rm_df: pd.DataFrame) -> dict:
+	return rm_df_to_dicts(rm_df)[0]
 
 
 def to_bounds_dict(rm_df: pd.DataFrame) -> dict:
-	b = {}
-	for _, r in rm_df.iterrows():
-		name = str(r["Material"]).strip()
-		if not name:
-			continue
-		b[name] = (float(r.get("min%", 0.0) or 0.0), float(r.get("max%", 100.0) or 100.0))
-	return b
+	return rm_df_to_dicts(rm_df)[1]
 
 
 def to_costs_dict(rm_df: pd.DataFrame) -> dict:
-	c = {}
-	for _, r in rm_df.iterrows():
-		name = str(r["Material"]).strip()
-		if not name:
-			continue
-		c[name] = float(r.get("HPP", 0.0) or 0.0)
-	return c
+	return rm_df_to_dicts(rm_df)[2]
+
+
+def materials_index(rm_df: pd.DataFrame) -> dict:
+	"""Material -> (HPP, H2O) lookup; the first row wins for a repeated name"""
+	index = {}
+	if rm_df is None or rm_df.empty:
+		return index
+	for r in rm_df.to_dict('records'):
+		index.setdefault(str(r.get('Material', '')).strip(), (float(r.get('HPP', 0) or 0), float(r.get('H2O', 0.0) or 0.0)))
+	return index
+
+
+# Composition values stay numeric; the browser formats them
+_PERCENT_COLUMN_CONFIG = {"%": st.column_config.NumberColumn("%", format="%.2f")}
+
+
+def _composition_frame(comp: dict, exclude=()) -> pd.DataFrame:
+	"""Oxide / % table of a stage composition"""
+	oxides = [ox for ox in comp if ox not in exclude]
+	return pd.DataFrame({"Oxide": oxides, "%": np.fromiter((comp[ox] for ox in oxides), dtype=np.float64, count=len(oxides))})
 
 
 def render_results_tab(state: dict, results: dict):
@@ -478,64 +483,41 @@ def render_results_tab(state: dict, results: dict):
 		tonKF = state.get('general', {}).get('tonKF', 533.0)
 		h2o_rawmeal = state.get('general', {}).get('h2o_rawmeal', 0.50)  # Use user-entered value
 		
-		# Create a nice table
-		prop_data = []
-		total_cost = 0
-		indeks_bahan_values = []  # Store Indeks Bahan values for normalization
-		
-		for material, percentage in sol.items():
-			if percentage is not None:
-				tph = (percentage/100) * tonKF
-				
-				# Find HPP and H2O from DataFrame
-				hpp = 0
-				h2o_material = 0.0
-				if rm_df is not None:
-					for _, row in rm_df.iterrows():
-						if str(row.get('Material', '')).strip() == material:
-							hpp = float(row.get('HPP', 0) or 0)
-							h2o_material = float(row.get('H2O', 0.0) or 0.0)
-							break
-				
-				# Calculate Indeks Bahan using the formula:
-				# Indeks Bahan = Proporsi Dry [%] * (100-H2O Rawmeal)/(100-H2O Raw Mix)
-				indeks_bahan = 0.0
-				if (100 - h2o_material) > 0:  # Avoid division by zero
-					indeks_bahan = percentage * (100 - h2o_rawmeal) / (100 - h2o_material)
-				
-				indeks_bahan_values.append(indeks_bahan)
-				cost_per_hour = tph * hpp
-				total_cost += cost_per_hour
-				
-				prop_data.append({
-					"Material": material,
-					"% Dry": f"{percentage:.2f}%",
-					"Indeks Bahan (%)": f"{indeks_bahan:.2f}%",
-					"TPH": f"{tph:.1f}",
-					"HPP (Rp/t)": f"{hpp:,.0f}",
-					"Cost (Rp/h)": f"{cost_per_hour:,.0f}"
-				})
+		# Per-material columns as aligned arrays
+		materials = [m for m, p in sol.items() if p is not None]
+		pct = np.array([sol[m] for m in materials], dtype=np.float64)
+		# Same index the sidebar and reports use, kept in state by app.py
+		rm_lookup = state.get('rm_df_by_material')
+		if rm_lookup is None:
+			rm_lookup = materials_index(rm_df)
+		hpp = np.array([rm_lookup.get(m, (0.0, 0.0))[0] for m in materials], dtype=np.float64)
+		h2o_material = np.array([rm_lookup.get(m, (0.0, 0.0))[1] for m in materials], dtype=np.float64)
+		tph = (pct / 100) * tonKF
+		
+		# Calculate Indeks Bahan using the formula:
+		# Indeks Bahan = Proporsi Dry [%] * (100-H2O Rawmeal)/(100-H2O Raw Mix)
+		dry = 100 - h2o_material
+		indeks_bahan = np.divide(pct * (100 - h2o_rawmeal), dry, out=np.zeros_like(pct), where=dry > 0)
+		cost_per_hour = tph * hpp
+		total_cost = float(cost_per_hour.sum())
 		
 		# Calculate normalized % Wet (normalize Indeks Bahan values to sum to 100%)
-		total_indeks_bahan = sum(indeks_bahan_values) if indeks_bahan_values else 0.0
-		for i, data_row in enumerate(prop_data):
-			if total_indeks_bahan > 0:
-				percent_wet = (indeks_bahan_values[i] / total_indeks_bahan) * 100
-			else:
-				percent_wet = 0.0
-			# Insert % Wet column after % Dry
-			new_row = {}
-			for key, value in data_row.items():
-				new_row[key] = value
-				if key == "% Dry":
-					new_row["% Wet"] = f"{percent_wet:.2f}%"
-			prop_data[i] = new_row
+		total_indeks_bahan = float(indeks_bahan.sum())
+		percent_wet = indeks_bahan / total_indeks_bahan * 100 if total_indeks_bahan > 0 else np.zeros_like(pct)
+		
+		prop_data = {
+			"Material": materials,
+			"% Dry": [f"{v:.2f}%" for v in pct],
+			"% Wet": [f"{v:.2f}%" for v in percent_wet],
+			"Indeks Bahan (%)": [f"{v:.2f}%" for v in indeks_bahan],
+			"TPH": [f"{v:.1f}" for v in tph],
+			"HPP (Rp/t)": [f"{v:,.0f}" for v in hpp],
+			"Cost (Rp/h)": [f"{v:,.0f}" for v in cost_per_hour],
+		}
 		
 		# Add TOTAL row
 		total_percentage = sum(sol.values()) if sol else 0
-		total_indeks_bahan = sum(indeks_bahan_values) if indeks_bahan_values else 0.0
-		
-		prop_data.append({
+		total_row = {
 			"Material": "TOTAL",
 			"% Dry": f"{total_percentage:.2f}%",
 			"% Wet": "100.00%",  # Normalized % Wet always sums to 100%
@@ -543,7 +525,9 @@ def render_results_tab(state: dict, results: dict):
 			"TPH": f"{tonKF:.1f}",
 			"HPP (Rp/t)": "-",
 			"Cost (Rp/h)": f"{total_cost:,.0f}"
-		})
+		}
+		for key, value in total_row.items():
+			prop_data[key].append(value)
 		
 		if prop_data:
 			st.dataframe(pd.DataFrame(prop_data), use_container_width=True)
@@ -597,7 +581,8 @@ def render_results_tab(state: dict, results: dict):
 			st.warning("⚠️ Missing RM dictionary or ash composition for detailed analysis")
 			return
 		
-		stages = calculate_all_stages(
+		# Stages are attached to the results once per solve; recompute only for older results
+		stages = results.get("stages") or calculate_all_stages(
 			RM=RM,
 			x_percent=sol,
 			dust=dust,
@@ -618,34 +603,25 @@ def render_results_tab(state: dict, results: dict):
 		# Raw Meal
 		with col1:
 			st.markdown("**Raw Meal Composition**")
-			rm_data = []
-			for ox, val in stages["raw_meal"].items():
-				rm_data.append({"Oxide": ox, "%": f"{val:.2f}"})
-			st.dataframe(pd.DataFrame(rm_data), use_container_width=True)
+			st.dataframe(_composition_frame(stages["raw_meal"]), use_container_width=True, column_config=_PERCENT_COLUMN_CONFIG)
 		
 		# Kiln Feed
 		with col2:
 			st.markdown("**Kiln Feed Composition**")
-			kf_data = []
-			for ox, val in stages["kiln_feed"].items():
-				kf_data.append({"Oxide": ox, "%": f"{val:.2f}"})
-			st.dataframe(pd.DataFrame(kf_data), use_container_width=True)
+			st.dataframe(_composition_frame(stages["kiln_feed"]), use_container_width=True, column_config=_PERCENT_COLUMN_CONFIG)
 		
 		# Clinker
 		with col3:
 			st.markdown("**Clinker Composition**")
-			cl_data = []
-			for ox, val in stages["clinker"].items():
-				if ox not in ["LOI", "FCaO"]:  # Exclude LOI and FCaO from main display
-					cl_data.append({"Oxide": ox, "%": f"{val:.2f}"})
-			st.dataframe(pd.DataFrame(cl_data), use_container_width=True)
+			# Exclude LOI and FCaO from main display
+			st.dataframe(_composition_frame(stages["clinker"], exclude=("LOI", "FCaO")), use_container_width=True, column_config=_PERCENT_COLUMN_CONFIG)
 		
 		# Quality moduli with constraint checking
 		st.subheader("Quality Moduli & Constraint Verification")
 		
-		rm_moduli = calculate_quality_moduli(stages["raw_meal"])
-		kf_moduli = calculate_quality_moduli(stages["kiln_feed"])
-		cl_moduli = calculate_quality_moduli(stages["clinker"])
+		rm_moduli = results.get("rm_moduli") or calculate_quality_moduli(stages["raw_meal"])
+		kf_moduli = results.get("kf_moduli") or calculate_quality_moduli(stages["kiln_feed"])
+		cl_moduli = results.get("cl_moduli") or calculate_quality_moduli(stages["clinker"])
 		
 		# Get constraints for comparison
 		constraints = state.get("constraints", {})
@@ -712,7 +688,7 @@ def render_results_tab(state: dict, results: dict):
 		
 		# Bogue calculation with C3S verification
 		st.subheader("Bogue Phases (Clinker)")
-		bogue = compute_bogue(stages["clinker"])
+		bogue = results.get("bogue") or compute_bogue(stages["clinker"])
 		
 		# C3S verification
 		c3s_actual = bogue.get('C3S', 0)
@@ -787,7 +763,7 @@ def render_results_tab(state: dict, results: dict):
 		dust_info_data.extend([
 			{"Parameter": "% Dust to Silo", "Value": f"{pSilo * 100:.1f}%"},
 			{"Parameter": "Dust to Silo (TPH)", "Value": f"{ton_dust_to_silo:.1f}"},
-			{"Parameter": "Est. Raw Meal (TPH)", "Value": f"{tonKF / (1 - pSilo) if (1 - pSilo) > 0 else tonKF:.1f}"}
+			{"Parameter": "Est. Raw Meal (TPH)", "Value": f"{ton_raw_meal:.1f}"}
 		])
 	elif pKiln > 0:
 		dust_info_data.extend([
@@ -802,40 +778,23 @@ def render_results_tab(state: dict, results: dict):
 	st.subheader("Fuel Heat Contribution Details")
 	fuels = state.get("fuel_rows", [])
 	if fuels:
-		fuel_heat_data = []
-		total_heat = 0.0
-		fine_coal_heat = 0.0
-		
-		# Calculate individual fuel heat contributions
-		for fuel in fuels:
-			fuel_name = str(fuel.get("Fuel", "")).strip()
-			prop = fuel.get("prop", 0.0) or 0.0
-			cv = fuel.get("cv", 0.0) or 0.0
-			heat_contribution = prop * cv
-			total_heat += heat_contribution
-			
-			if "fine coal" in fuel_name.lower() or "finecoal" in fuel_name.lower().replace(" ", ""):
-				fine_coal_heat += heat_contribution
-			
-			fuel_heat_data.append({
-				"Fuel": fuel_name,
-				"Proportion (%)": f"{prop:.1f}%",
-				"CV (kcal/kg)": f"{cv:.0f}",
-				"Heat Contribution": f"{heat_contribution:.0f}"
-			})
+		# Heat contribution per fuel from the shared column arrays
+		arr = fuel_arrays(fuels)
+		heat = arr["prop"] * arr["cv"]
+		total_heat = float(heat.sum())
 		
 		if total_heat > 0:
 			# Calculate percentages
-			fine_coal_pct = (fine_coal_heat / total_heat) * 100
+			fine_coal_pct = (float(heat[arr["fine_coal"]].sum()) / total_heat) * 100
 			alternative_fuel_pct = 100 - fine_coal_pct
 			
-			# Add percentage column
-			for i, row in enumerate(fuel_heat_data):
-				fuel = fuels[i]
-				heat_contrib = (fuel.get("prop", 0.0) or 0.0) * (fuel.get("cv", 0.0) or 0.0)
-				heat_pct = (heat_contrib / total_heat) * 100 if total_heat > 0 else 0
-				row["Heat %"] = f"{heat_pct:.1f}%"
-			
+			fuel_heat_data = {
+				"Fuel": [str(fuel.get("Fuel", "")).strip() for fuel in fuels],
+				"Proportion (%)": [f"{v:.1f}%" for v in arr["prop"]],
+				"CV (kcal/kg)": [f"{v:.0f}" for v in arr["cv"]],
+				"Heat Contribution": [f"{v:.0f}" for v in heat],
+				"Heat %": [f"{v:.1f}%" for v in heat / total_heat * 100],
+			}
 			st.dataframe(pd.DataFrame(fuel_heat_data), use_container_width=True)
 			
 			# Summary
@@ -848,12 +807,11 @@ def render_results_tab(state: dict, results: dict):
 		st.info("💡 No fuel data available for heat contribution analysis.")
 
 
+@st.fragment
 def build_project_management_sidebar():
-	"""Build project management interface in sidebar"""
-	st.sidebar.markdown("---")
-	st.sidebar.markdown("**📁 Project Management**")
-	
-	from core.database import db
+	"""Build project management interface; call inside the sidebar"""
+	st.markdown("---")
+	st.markdown("**📁 Project Management**")
 	
 	# Get current user
 	user_info = auth_manager.get_current_user()
@@ -874,171 +832,196 @@ def build_project_management_sidebar():
 			st.session_state.current_project_id = project_id
 			projects = db.get_projects(user_id=user_id)
 	
+	projects_by_id = {p["id"]: p for p in projects}
+	
 	# Project selector
 	if projects:
 		project_names = [f"{p['name']}" for p in projects]
-		project_ids = [p["id"] for p in projects]
+		id_to_idx = {p["id"]: i for i, p in enumerate(projects)}
+		current_idx = id_to_idx.get(st.session_state.current_project_id, 0)
 		
-		current_idx = 0
-		if st.session_state.current_project_id in project_ids:
-			current_idx = project_ids.index(st.session_state.current_project_id)
-		
-		selected_name = st.sidebar.selectbox(
+		selected_idx = st.selectbox(
 			"Select Project:",
-			project_names,
+			range(len(projects)),
 			index=current_idx,
+			format_func=project_names.__getitem__,
 			key="project_selector"
 		)
 		
-		selected_idx = project_names.index(selected_name)
-		selected_project_id = project_ids[selected_idx]
+		selected_project_id = projects[selected_idx]["id"]
 		
 		if selected_project_id != st.session_state.current_project_id:
 			st.session_state.current_project_id = selected_project_id
 			st.rerun()
 	
 	# Project management buttons
-	col1, col2 = st.sidebar.columns(2)
+	col1, col2 = st.columns(2)
 	
 	with col1:
 		if st.button("➕ New", key="new_project_btn", help="Create new project", use_container_width=True):
-			st.session_state.show_new_project_dialog = True
+			_new_project_dialog(user_id)
 	
 	with col2:
 		if st.button("💾 Save", key="save_project_btn", help="Save current project", use_container_width=True):
-			save_current_project()
-			st.sidebar.success("✅ Project saved!")
-	
-	# New project dialog
-	if st.session_state.get("show_new_project_dialog", False):
-		with st.sidebar.expander("➕ New Project", expanded=True):
-			new_name = st.text_input("Project Name:", key="new_project_name")
-			new_desc = st.text_area("Description:", key="new_project_desc", height=60)
-			
-			col1, col2 = st.columns(2)
-			with col1:
-				if st.button("Create", key="create_project_confirm"):
-					if new_name.strip():
-						try:
-							project_id = db.create_project(new_name.strip(), new_desc.strip(), user_id=user_id)
-							st.session_state.current_project_id = project_id
-							st.session_state.show_new_project_dialog = False
-							st.rerun()
-						except Exception as e:
-							st.error(f"Error creating project: {str(e)}")
-					else:
-						st.error("Project name is required")
-			
-			with col2:
-				if st.button("Cancel", key="create_project_cancel"):
-					st.session_state.show_new_project_dialog = False
-					st.rerun()
+			# A failed save has already shown its error
+			save_status = save_current_project()
+			if save_status == "saved":
+				st.success("✅ Project saved!")
+			elif save_status == "unchanged":
+				st.info("No changes to save.")
 	
 	# Project actions
 	if projects and len(projects) > 1:
-		with st.sidebar.expander("🔧 Project Actions"):
+		with st.expander("🔧 Project Actions"):
 			if st.button("🗂️ Import Project", key="import_project_btn"):
-				st.session_state.show_import_dialog = True
+				_import_project_dialog(user_id, datetime.now().strftime('%Y%m%d_%H%M'))
 			
 			if st.button("📤 Export Project", key="export_project_btn"):
 				export_current_project()
 			
 			if st.button("🗑️ Delete Project", key="delete_project_btn"):
-				st.session_state.show_delete_dialog = True
-	
-	# Import dialog
-	if st.session_state.get("show_import_dialog", False):
-		with st.sidebar.expander("🗂️ Import Project", expanded=True):
-			uploaded_file = st.file_uploader("Choose project file:", type=['json'], key="import_file")
+				_delete_project_dialog(projects_by_id.get(st.session_state.current_project_id), projects, user_id)
+
+
+# Dialogs rerun only themselves while open; closing them without acting needs no rerun
+@st.dialog("➕ New Project")
+def _new_project_dialog(user_id):
+	new_name = st.text_input("Project Name:", key="new_project_name")
+	new_desc = st.text_area("Description:", key="new_project_desc", height=60)
+	
+	if st.button("Create", key="create_project_confirm"):
+		if new_name.strip():
+			try:
+				project_id = db.create_project(new_name.strip(), new_desc.strip(), user_id=user_id)
+				st.session_state.current_project_id = project_id
+				st.rerun()
+			except Exception as e:
+				st.error(f"Error creating project: {str(e)}")
+		else:
+			st.error("Project name is required")
+
+
+@st.dialog("🗂️ Import Project")
+def _import_project_dialog(user_id, opened_at):
+	uploaded_file = st.file_uploader("Choose project file:", type=['json', 'gz'], key="import_file")
+	
+	if uploaded_file is not None:
+		try:
+			raw = uploaded_file.getvalue()
+			if raw[:2] == b"\x1f\x8b":
+				raw = gzip.decompress(raw)
+			import_data = orjson.loads(raw)
 			
-			if uploaded_file is not None:
-				try:
-					import_data = json.loads(uploaded_file.read().decode('utf-8'))
-					
-					import_name = st.text_input("Import as:", value=f"Imported_{datetime.now().strftime('%Y%m%d_%H%M')}")
-					
-					col1, col2 = st.columns(2)
-					with col1:
-						if st.button("Import", key="import_confirm"):
-							if import_name.strip():
-								project_id = db.import_project(import_name.strip(), import_data, user_id=user_id)
-								st.session_state.current_project_id = project_id
-								st.session_state.show_import_dialog = False
-								st.success("✅ Project imported!")
-								st.rerun()
-							else:
-								st.error("Project name is required")
-					
-					with col2:
-						if st.button("Cancel", key="import_cancel"):
-							st.session_state.show_import_dialog = False
-							st.rerun()
-				
-				except Exception as e:
-					st.error(f"Error importing project: {str(e)}")
-	
-	# Delete confirmation dialog
-	if st.session_state.get("show_delete_dialog", False):
-		with st.sidebar.expander("🗑️ Delete Project", expanded=True):
-			current_project = next((p for p in projects if p["id"] == st.session_state.current_project_id), None)
-			if current_project:
-				st.warning(f"Delete '{current_project['name']}'?")
-				st.caption("This action cannot be undone.")
-				
-				col1, col2 = st.columns(2)
-				with col1:
-					if st.button("Delete", key="delete_confirm"):
-						db.delete_project(st.session_state.current_project_id)
-						
-						# Switch to another project
-						remaining_projects = [p for p in projects if p["id"] != st.session_state.current_project_id]
-						if remaining_projects:
-							st.session_state.current_project_id = remaining_projects[0]["id"]
-						else:
-							# Create a new default project
-							project_id = db.create_project("Default Project", "New project", user_id=user_id)
-							st.session_state.current_project_id = project_id
-						
-						st.session_state.show_delete_dialog = False
-						st.success("✅ Project deleted!")
-						st.rerun()
-				
-				with col2:
-					if st.button("Cancel", key="delete_cancel"):
-						st.session_state.show_delete_dialog = False
-						st.rerun()
+			# opened_at is fixed when the dialog opens, so the default name does not drift
+			import_name = st.text_input("Import as:", value=f"Imported_{opened_at}")
+			
+			if st.button("Import", key="import_confirm"):
+				if import_name.strip():
+					project_id = db.import_project(import_name.strip(), import_data, user_id=user_id)
+					st.session_state.current_project_id = project_id
+					st.success("✅ Project imported!")
+					st.rerun()
+				else:
+					st.error("Project name is required")
+		
+		except Exception as e:
+			st.error(f"Error importing project: {str(e)}")
+
+
+@st.dialog("🗑️ Delete Project")
+def _delete_project_dialog(current_project, projects, user_id):
+	if current_project:
+		st.warning(f"Delete '{current_project['name']}'?")
+		st.caption("This action cannot be undone.")
+		
+		if st.button("Delete", key="delete_confirm"):
+			db.delete_project(current_project["id"])
+			
+			# Switch to another project
+			next_project_id = next((p["id"] for p in projects if p["id"] != current_project["id"]), None)
+			if next_project_id:
+				st.session_state.current_project_id = next_project_id
+			else:
+				# Create a new default project
+				project_id = db.create_project("Default Project", "New project", user_id=user_id)
+				st.session_state.current_project_id = project_id
+			
+			st.success("✅ Project deleted!")
+			st.rerun()
+
+
+def _save_signature(value):
+	"""Short digest of a state component, or None when it cannot be hashed"""
+	h = hashlib.blake2b(digest_size=8)
+	try:
+		if isinstance(value, pd.DataFrame):
+			h.update(orjson.dumps(list(value.columns)))
+			h.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+		else:
+			h.update(orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+	except (TypeError, orjson.JSONEncodeError):
+		return None
+	return h.digest()
 
 
 def save_current_project():
-	"""Save current session state to database"""
+	"""Save current session state to database; returns saved, unchanged or failed"""
 	if "current_project_id" not in st.session_state or "state" not in st.session_state:
-		return
-	
-	from core.database import db
+		st.error("No project selected to save.")
+		return "failed"
 	
 	try:
 		project_id = st.session_state.current_project_id
 		state = st.session_state.state
+		results = st.session_state.get("results_cache")
+		
+		# Only write components that changed since this project was last saved
+		saved = st.session_state.get("saved_signatures", {})
+		if saved.get("project_id") != project_id:
+			saved = {}
+		sigs = {
+			"general": _save_signature(state.get("general", {})),
+			"rm_df": _save_signature(state.get("rm_df")),
+			"fuel_rows": _save_signature(state.get("fuel_rows")),
+			"constraints": _save_signature(state.get("constraints", {})),
+			"dust": _save_signature(state.get("dust", {})),
+			"results": _save_signature(results),
+		}
+		changed = {k for k, sig in sigs.items() if sig is None or sig != saved.get(k)}
+		if not changed:
+			return "unchanged"
+		
+		# Save all changed components in one transaction
+		with db.transaction():
+			if "general" in changed:
+				db.save_general_params(project_id, state.get("general", {}))
+			
+			if "rm_df" in changed and "rm_df" in state and not state["rm_df"].empty:
+				db.update_raw_materials(project_id, state["rm_df"])
+			
+			if "fuel_rows" in changed and "fuel_rows" in state:
+				db.update_fuels(project_id, state["fuel_rows"])
+			
+			if "constraints" in changed:
+				db.save_constraints(project_id, state.get("constraints", {}))
+			if "dust" in changed:
+				db.save_dust_composition(project_id, state.get("dust", {}))
+			
+			# Save results if available
+			if "results" in changed and results:
+				calc_time = st.session_state.get('last_solve_time', 0.0)
+				db.save_result(project_id, results, calc_time)
 		
-		# Save all components
-		db.save_general_params(project_id, state.get("general", {}))
-		
-		if "rm_df" in state and not state["rm_df"].empty:
-			db.update_raw_materials(project_id, state["rm_df"])
-		
-		if "fuel_rows" in state:
-			db.update_fuels(project_id, state["fuel_rows"])
-		
-		db.save_constraints(project_id, state.get("constraints", {}))
-		db.save_dust_composition(project_id, state.get("dust", {}))
-		
-		# Save results if available
-		if hasattr(st.session_state, 'results_cache') and st.session_state.results_cache:
-			calc_time = st.session_state.get('last_solve_time', 0.0)
-			db.save_result(project_id, st.session_state.results_cache, calc_time)
+		st.session_state.saved_signatures = {"project_id": project_id, **sigs}
+		return "saved"
 	
 	except Exception as e:
 		st.error(f"Error saving project: {str(e)}")
+		return "failed"
+
+
+# Exports above this size (compact JSON bytes) are downloaded as .json.gz
+_GZIP_EXPORT_BYTES = 256 * 1024
 
 
 def export_current_project():
@@ -1046,30 +1029,35 @@ def export_current_project():
 	if "current_project_id" not in st.session_state:
 		return
 	
-	from core.database import db
-	
 	try:
 		project_id = st.session_state.current_project_id
 		export_data = db.export_project(project_id)
 		
 		# Get project info
-		projects = db.get_projects()
-		current_project = next((p for p in projects if p["id"] == project_id), None)
+		projects_by_id = {p["id"]: p for p in db.get_projects()}
+		current_project = projects_by_id.get(project_id)
 		
 		if current_project:
 			filename = f"{current_project['name'].replace(' ', '_')}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 			
-			st.sidebar.download_button(
+			# Small exports stay indented JSON; large ones are compact and gzipped
+			data = orjson.dumps(export_data, option=orjson.OPT_SERIALIZE_NUMPY)
+			if len(data) > _GZIP_EXPORT_BYTES:
+				data, filename, mime = gzip.compress(data, compresslevel=3), filename + ".gz", "application/gzip"
+			else:
+				data, mime = orjson.dumps(export_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY), "application/json"
+			
+			st.download_button(
 				label="⬇️ Download Export",
-				data=json.dumps(export_data, indent=2),
+				data=data,
 				file_name=filename,
-				mime="application/json",
+				mime=mime,
 				key="download_export"
 			)
-			st.sidebar.success("✅ Export ready!")
+			st.success("✅ Export ready!")
 	
 	except Exception as e:
-		st.sidebar.error(f"Export error: {str(e)}")
+		st.error(f"Export error: {str(e)}")
 
 
 def load_project_data():
@@ -1077,17 +1065,16 @@ def load_project_data():
 	if "current_project_id" not in st.session_state:
 		return
 	
-	from core.database import db
-	
 	try:
 		project_id = st.session_state.current_project_id
 		
-		# Load all project components
-		general_params = db.get_general_params(project_id)
-		raw_materials_df = db.get_raw_materials(project_id)
-		fuel_data = db.get_fuels(project_id)
-		constraints = db.get_constraints(project_id)
-		dust_composition = db.get_dust_composition(project_id)
+		# Load all project components without a save interleaving
+		with db.transaction():
+			general_params = db.get_general_params(project_id)
+			raw_materials_df = db.get_raw_materials(project_id)
+			fuel_data = db.get_fuels(project_id)
+			constraints = db.get_constraints(project_id)
+			dust_composition = db.get_dust_composition(project_id)
 		
 		# Update session state
 		st.session_state.state = {
@@ -1114,49 +1101,61 @@ def build_project_history_tab():
 		st.info("No project selected.")
 		return
 	
-	from core.database import db
-	
 	try:
 		project_id = st.session_state.current_project_id
-		history = db.get_results_history(project_id, limit=20)
+		history = db.get_results_history_summary(project_id, limit=20)
 		
 		if not history:
 			st.info("No calculation history available for this project.")
 			return
 		
-		# Display history summary
+		# Display history summary as one table
 		st.markdown("**Recent Calculations:**")
-		
-		for i, result in enumerate(history):
-			with st.expander(f"Calculation {i+1} - {result['created_at'][:19]} (Status: {'✅' if result['solver_status'] == 1 else '❌'})"):
-				col1, col2, col3 = st.columns(3)
-				
-				with col1:
-					st.metric("Solver Status", "Success" if result['solver_status'] == 1 else "Failed")
-					st.metric("Calculation Time", f"{result['calculation_time']:.2f}s")
-				
-				with col2:
-					if result['solution_data']:
-						st.markdown("**Solution:**")
-						for material, proportion in result['solution_data'].items():
-							st.caption(f"{material}: {proportion:.2f}%")
-				
-				with col3:
-					st.markdown("**Metadata:**")
-					if result['meta_data']:
-						for key, value in result['meta_data'].items():
-							if key != 'objective_value':
-								st.caption(f"{key}: {value}")
-				
-				# Load this result button
-				if st.button(f"📋 Load Result {i+1}", key=f"load_result_{i}"):
-					st.session_state.results_cache = {
-						"status": result['solver_status'],
-						"solution": result['solution_data'],
-						"meta": result['meta_data']
-					}
-					st.success("✅ Result loaded into current session!")
-					st.rerun()
+		st.dataframe(pd.DataFrame({
+			"Calculation": range(1, len(history) + 1),
+			"When": [result['created_at'][:19] for result in history],
+			"Status": ["✅" if result['solver_status'] == 1 else "❌" for result in history],
+			"Time (s)": [result['calculation_time'] for result in history],
+		}), use_container_width=True, hide_index=True, column_config={"Time (s)": st.column_config.NumberColumn(format="%.2f")})
+		
+		# Details and loading only for the selected calculation
+		i = st.selectbox(
+			"Calculation:",
+			range(len(history)),
+			format_func=lambda i: f"Calculation {i+1} - {history[i]['created_at'][:19]}",
+			key="history_selected",
+		)
+		# Stored results never change, so each payload is fetched once per session
+		details = st.session_state.setdefault("result_details", {})
+		if history[i]['id'] not in details:
+			details[history[i]['id']] = db.get_result_detail(history[i]['id']) or {"solution_data": None, "meta_data": None}
+		result = {**history[i], **details[history[i]['id']]}
+		with st.expander("Details", expanded=False):
+			col1, col2, col3 = st.columns(3)
+			
+			with col1:
+				st.metric("Solver Status", "Success" if result['solver_status'] == 1 else "Failed")
+				st.metric("Calculation Time", f"{result['calculation_time']:.2f}s")
+			
+			with col2:
+				if result['solution_data']:
+					st.markdown("**Solution:**")
+					st.caption("  \n".join(f"{material}: {proportion:.2f}%" for material, proportion in result['solution_data'].items()))
+			
+			with col3:
+				st.markdown("**Metadata:**")
+				if result['meta_data']:
+					st.json({key: value for key, value in result['meta_data'].items() if key != 'objective_value'}, expanded=False)
+		
+		# Load the selected result
+		if st.button(f"📋 Load Result {i+1}", key="load_result"):
+			st.session_state.results_cache = {
+				"status": result['solver_status'],
+				"solution": result['solution_data'],
+				"meta": result['meta_data']
+			}
+			st.success("✅ Result loaded into current session!")
+			st.rerun()
 	
 	except Exception as e:
 		st.error(f"Error loading project history: {str(e)}")